@@ -6,14 +6,26 @@ A natural language to shell command translator
 __version__ = "1.0.0"
 __author__ = "Shell AI Team"
 
-from .assistant import ShellAIAssistant
-from .config import Config
-from .command_executor import CommandExecutor
-from .system_info import SystemInfo
+# Public classes are imported on first access so that importing a light
+# submodule (e.g. shell_ai.config) doesn't pull in the LLM client stack
+_EXPORTS = {
+    "ShellAIAssistant": ".assistant",
+    "Config": ".config",
+    "CommandExecutor": ".command_executor",
+    "SystemInfo": ".system_info",
+}
 
 __all__ = [
     "ShellAIAssistant",
     "Config", 
     "CommandExecutor",
     "SystemInfo"
-]
\ No newline at end of file
+]
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
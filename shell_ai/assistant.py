@@ -4,35 +4,138 @@ Handles communication with OpenAI and Ollama models
 """
 
 import os
-import json
-import requests
-from typing import List, Dict, Optional, Tuple
-from openai import OpenAI
-from colorama import Fore, Style, init
+import sys
+import asyncio
+import hashlib
+import itertools
+import aiohttp
+from cachetools import TTLCache
+from collections import deque
+from typing import Deque, List, Dict, Optional
+from openai import AsyncOpenAI, BadRequestError
 
 from .config import Config
-from .prompts import PromptBuilder
+from .colors import Fore, Style
+from .jsonio import loads, dumpb
+from .prompts import PromptBuilder, JSONObjectScanner
 from .system_info import SystemInfo
 from .command_executor import CommandExecutor
 
-# Initialize colorama
-init(autoreset=True)
+# Precomputed colored fragments for the suggestion panel and choice prompts
+_RULE = f"{Fore.CYAN}{'=' * 60}"
+_PANEL_HEADER = f"\n{_RULE}\n{Fore.CYAN}🤖 AI COMMAND SUGGESTION\n{_RULE}"
+_PANEL_FOOTER = f"{_RULE}{Style.RESET_ALL}"
+_COMMAND_LABEL = f"\n{Fore.GREEN}💻 Command:"
+_EXPLANATION_LABEL = f"\n{Fore.BLUE}📝 Explanation:"
+_RISKS_LABEL = f"\n{Fore.YELLOW}⚠️  Potential Issues:"
+_ALTERNATIVES_LABEL = f"\n{Fore.MAGENTA}🔄 Alternatives:"
+_SAFETY_SAFE = f"\n{Fore.CYAN}🛡️  Safety: {Fore.GREEN}✅ SAFE"
+_SAFETY_CAUTION = f"\n{Fore.CYAN}🛡️  Safety: {Fore.RED}🚨 REQUIRES CAUTION"
+_PROMPT_SAFE = f"\n{Fore.CYAN}Choose: [y]es, [n]o, [e]dit, [a]lternatives, [q]uit: {Style.RESET_ALL}"
+_PROMPT_UNSAFE = (f"\n{Fore.YELLOW}⚠️  CAUTION REQUIRED ⚠️\n"
+                  f"Choose: [y]es (I understand risks), [n]o, [e]dit, [a]lternatives, [q]uit: {Style.RESET_ALL}")
+_INVALID_CHOICE = f"{Fore.RED}Invalid choice. Please try again.{Style.RESET_ALL}"
+
+# Actions for each key accepted by get_user_choice
+_CHOICE_KEYS = {
+    'y': 'execute',
+    'n': 'cancel',
+    'e': 'edit',
+    'a': 'alternatives',
+    'q': 'quit',
+}
+
+def _read_key(prompt: str) -> str:
+    """Show prompt and read a single keystroke without waiting for Enter
+    
+    Falls back to reading a whole line (and taking its first character)
+    when stdin is not a terminal, e.g. when input is piped in.
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    
+    if not sys.stdin.isatty():
+        return input().strip()[:1]
+    
+    try:
+        import termios
+        import tty
+    except ImportError:  # Windows
+        import msvcrt
+        key = msvcrt.getwch()
+    else:
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            key = sys.stdin.read(1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    
+    # Echo the key so the choice stays visible in the transcript
+    sys.stdout.write(f"{key}\n")
+    return key
+
+# Request headers for pre-encoded JSON bodies
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# OpenAI models that accept response_format={"type": "json_object"}; plain
+# gpt-4 and the pre-1106 gpt-3.5 snapshots reject it with a 400
+_JSON_MODE_MODELS = ('gpt-4o', 'gpt-4.1', 'gpt-4-turbo', 'gpt-4-1106', 'gpt-4-0125',
+                     'gpt-3.5-turbo-1106', 'gpt-3.5-turbo-0125')
+
+def _supports_json_mode(model: str) -> bool:
+    """Check whether an OpenAI model is known to support JSON mode"""
+    return model == 'gpt-3.5-turbo' or model.startswith(_JSON_MODE_MODELS)
+
+# Upper bound on completion tokens for one batched request; 4096 is the
+# output limit of the turbo/4o models and keeps gpt-4 inside its 8k context
+_BATCH_MAX_TOKENS = 4096
+
+def _batch_max_tokens(per_item: int, count: int) -> int:
+    """Completion-token budget for a batch of count queries"""
+    return min(per_item * count, _BATCH_MAX_TOKENS)
 
 class ShellAIAssistant:
     """Main AI Assistant class"""
     
+    # Maximum number of queries marshaled into a single batched request
+    BATCH_SIZE = 8
+    
+    # Placeholder commands of error and parse-failure responses
+    _UNCACHEABLE_COMMANDS = frozenset({
+        "# Error occurred",
+        "echo 'Error parsing AI response'",
+    })
+    
     def __init__(self, config: Optional[Config] = None):
         """Initialize the AI assistant"""
         self.config = config or Config()
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history: Deque[Dict[str, str]] = deque(
+            maxlen=self.config.get('history.max_entries', 20)
+        )
         self.executor = CommandExecutor()
         self.prompt_builder = PromptBuilder()
         
         # Initialize AI client based on provider
         if self.config.is_openai:
-            self.client = OpenAI(api_key=self.config.api_key)
+            self.aclient = AsyncOpenAI(api_key=self.config.api_key)
         else:
-            self.client = None  # Ollama uses REST API directly
+            self.aclient = None  # Ollama uses REST API directly
+        
+        # Request JSON-mode output from OpenAI when configured, or by default
+        # for models known to accept it; disabled if the model rejects it
+        self._json_mode = self.config.get('openai.json_mode')
+        if self._json_mode is None:
+            self._json_mode = _supports_json_mode(self.config.get('openai.model', 'gpt-4'))
+        
+        # Private event loop backing the synchronous wrappers; reused so the
+        # async clients keep their connections bound to a single loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Pooled HTTP session for Ollama, created lazily on the running loop
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Get system context
         self.system_context = SystemInfo.get_full_context()
@@ -40,47 +143,206 @@ class ShellAIAssistant:
         
         # Build system prompt
         self.system_prompt = self.prompt_builder.get_system_prompt(self.system_context)
+        # Shared system message leading every request; never mutated, so the
+        # prompt prefix stays byte-identical for server-side prefix caching
+        self._sys_msg = {"role": "system", "content": self.system_prompt}
+        self._sys_prompt_hash = hashlib.blake2b(
+            self.system_prompt.encode(), digest_size=8
+        ).hexdigest()
+        
+        # Recent stateless suggestions (get_many), so repeating a query skips
+        # the model round-trip; stateful requests never read or fill it
+        self._sugg_cache: TTLCache = TTLCache(maxsize=256, ttl=600)
     
     def add_to_history(self, role: str, content: str):
         """Add message to conversation history"""
+        # The deque is bounded by history.max_entries and evicts old entries
         self.conversation_history.append({"role": role, "content": content})
-        
-        # Keep only last N exchanges based on config
-        max_entries = self.config.get('history.max_entries', 20)
-        if len(self.conversation_history) > max_entries:
-            self.conversation_history = self.conversation_history[-max_entries:]
+    
+    def recent_history(self, n: int) -> List[Dict[str, str]]:
+        """Get the last n history messages, oldest first"""
+        history = self.conversation_history
+        return list(itertools.islice(history, max(0, len(history) - n), None))
+    
+    def _run(self, coro):
+        """Run a coroutine to completion on the assistant's event loop"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+    
+    def _get_http(self) -> aiohttp.ClientSession:
+        """Get the keep-alive HTTP session bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.closed or self._http_loop is not loop:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=8, limit_per_host=4)
+            )
+            self._http_loop = loop
+        return self._http
+    
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections held by the assistant"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        if self.aclient is not None:
+            await self.aclient.close()
+    
+    def close(self) -> None:
+        """Close pooled connections and the assistant's event loop"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
     
     def get_command_suggestion(self, user_input: str) -> Dict:
         """Get command suggestion from AI"""
+        return self._run(self.get_command_suggestion_async(user_input))
+    
+    async def get_command_suggestion_async(self, user_input: str, stateless: bool = False) -> Dict:
+        """Get command suggestion from AI without blocking the event loop
+        
+        With stateless=True the request carries no conversation history and
+        the exchange is not recorded, so concurrent calls can't interleave.
+        Only stateless requests use the suggestion cache: a stateful answer
+        depends on the conversation so far, which the cache key can't capture.
+        """
+        key = (user_input, self.config.provider, self.config.model, self._sys_prompt_hash)
+        if stateless:
+            cached = self._sugg_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+        
         try:
             if self.config.is_openai:
-                return self._get_openai_suggestion(user_input)
+                suggestion = await self._get_openai_suggestion(user_input, stateless)
             else:
-                return self._get_ollama_suggestion(user_input)
+                suggestion = await self._get_ollama_suggestion(user_input, stateless)
         except Exception as e:
             return self._error_response(str(e))
+        
+        # Only cache real answers so transient failures are retried
+        if stateless and suggestion.get('command') not in self._UNCACHEABLE_COMMANDS:
+            self._sugg_cache[key] = suggestion
+        return dict(suggestion)
+    
+    async def get_many(self, inputs: List[str]) -> List[Dict]:
+        """Get suggestions for several inputs with overlapping requests
+        
+        Like the batch path, the fan-out is stateless: the requests run
+        concurrently, so they neither read nor extend the conversation history.
+        """
+        return await asyncio.gather(
+            *(self.get_command_suggestion_async(x, stateless=True) for x in inputs)
+        )
+    
+    def get_command_suggestions_batch(self, user_inputs: List[str]) -> List[Dict]:
+        """Get suggestions for several inputs using one request per batch"""
+        return self._run(self.get_command_suggestions_batch_async(user_inputs))
     
-    def _get_openai_suggestion(self, user_input: str) -> Dict:
+    async def get_command_suggestions_batch_async(self, user_inputs: List[str]) -> List[Dict]:
+        """Get suggestions for several inputs, BATCH_SIZE queries per request"""
+        batches = [
+            user_inputs[i:i + self.BATCH_SIZE]
+            for i in range(0, len(user_inputs), self.BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._get_batch_suggestions(b) for b in batches))
+        return [suggestion for batch in results for suggestion in batch]
+    
+    async def _get_batch_suggestions(self, batch: List[str]) -> List[Dict]:
+        """Get suggestions for a batch of inputs in a single API round-trip
+        
+        Batched queries are stateless: they are not added to the
+        conversation history.
+        """
+        batch_prompt = self.prompt_builder.get_batch_prompt(batch)
+        
+        try:
+            if self.config.is_openai:
+                response = await self.aclient.chat.completions.create(
+                    model=self.config.get('openai.model', 'gpt-4'),
+                    messages=[self._sys_msg, {"role": "user", "content": batch_prompt}],
+                    temperature=self.config.get('openai.temperature', 0.1),
+                    max_tokens=_batch_max_tokens(
+                        self.config.get('openai.max_tokens', 1000), len(batch)
+                    )
+                )
+                ai_response = response.choices[0].message.content
+            else:
+                url = f"{self.config.ollama_host}/api/generate"
+                payload = {
+                    "model": self.config.get('ollama.model'),
+                    "prompt": self.prompt_builder.format_ollama_batch_messages(
+                        self.system_prompt, batch_prompt
+                    ),
+                    "stream": False,
+                    "temperature": self.config.get('ollama.temperature', 0.1),
+                    "max_tokens": _batch_max_tokens(
+                        self.config.get('ollama.max_tokens', 1000), len(batch)
+                    )
+                }
+                timeout = aiohttp.ClientTimeout(total=30 * len(batch))
+                async with self._get_http().post(
+                    url, data=dumpb(payload), headers=_JSON_HEADERS, timeout=timeout
+                ) as response:
+                    if response.status != 200:
+                        error = self._error_response(f"Ollama API error: {await response.text()}")
+                        return [dict(error) for _ in batch]
+                    result = loads(await response.read())
+                ai_response = result.get('response', '')
+        except Exception as e:
+            error = self._error_response(f"Batch request error: {str(e)}")
+            return [dict(error) for _ in batch]
+        
+        return self.prompt_builder.validate_json_array_response(ai_response, len(batch))
+    
+    async def _get_openai_suggestion(self, user_input: str, stateless: bool = False) -> Dict:
         """Get suggestion from OpenAI"""
         try:
-            # Add user input to history
-            self.add_to_history("user", user_input)
-            
             # Prepare messages
-            messages = [{"role": "system", "content": self.system_prompt}]
-            messages.extend(self.conversation_history)
+            if stateless:
+                messages = [self._sys_msg, {"role": "user", "content": user_input}]
+            else:
+                # Add user input to history
+                self.add_to_history("user", user_input)
+                messages = [self._sys_msg, *self.conversation_history]
             
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
+            # Call OpenAI API with streaming enabled, in JSON mode when the
+            # model supports it
+            request = dict(
                 model=self.config.get('openai.model', 'gpt-4'),
                 messages=messages,
                 temperature=self.config.get('openai.temperature', 0.1),
-                max_tokens=self.config.get('openai.max_tokens', 1000)
+                max_tokens=self.config.get('openai.max_tokens', 1000),
+                stream=True
             )
+            if self._json_mode:
+                try:
+                    stream = await self.aclient.chat.completions.create(
+                        response_format={"type": "json_object"}, **request
+                    )
+                except BadRequestError as e:
+                    if 'response_format' not in str(e):
+                        raise
+                    # Older models (e.g. gpt-4) reject JSON mode; stop asking
+                    self._json_mode = False
+                    stream = await self.aclient.chat.completions.create(**request)
+            else:
+                stream = await self.aclient.chat.completions.create(**request)
+            
+            # Accumulate tokens and stop as soon as the JSON object closes,
+            # so trailing prose never has to be generated or transferred
+            scanner = JSONObjectScanner()
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    if scanner.feed(chunk.choices[0].delta.content or "") is not None:
+                        break
+            finally:
+                await stream.close()
+            ai_response = scanner.text
             
-            # Parse response
-            ai_response = response.choices[0].message.content
-            self.add_to_history("assistant", ai_response)
+            if not stateless:
+                self.add_to_history("assistant", ai_response)
             
             # Validate and parse JSON
             return self.prompt_builder.validate_json_response(ai_response)
@@ -88,7 +350,7 @@ class ShellAIAssistant:
         except Exception as e:
             return self._error_response(f"OpenAI API error: {str(e)}")
     
-    def _get_ollama_suggestion(self, user_input: str) -> Dict:
+    async def _get_ollama_suggestion(self, user_input: str, stateless: bool = False) -> Dict:
         """Get suggestion from Ollama"""
         try:
             # Format prompt for Ollama
@@ -107,26 +369,34 @@ class ShellAIAssistant:
                 "max_tokens": self.config.get('ollama.max_tokens', 1000)
             }
             
-            response = requests.post(url, json=payload, timeout=30)
-            
-            if response.status_code != 200:
-                return self._error_response(f"Ollama API error: {response.text}")
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with self._get_http().post(
+                url, data=dumpb(payload), headers=_JSON_HEADERS, timeout=timeout
+            ) as response:
+                if response.status != 200:
+                    return self._error_response(
+                        f"Ollama API error: {await response.text()}"
+                    )
+                
+                # Parse response
+                result = loads(await response.read())
             
-            # Parse response
-            result = response.json()
             ai_response = result.get('response', '')
             
             # Add to history
-            self.add_to_history("user", user_input)
-            self.add_to_history("assistant", ai_response)
+            if not stateless:
+                self.add_to_history("user", user_input)
+                self.add_to_history("assistant", ai_response)
             
             # Validate and parse JSON
             return self.prompt_builder.validate_json_response(ai_response)
             
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectorError:
             return self._error_response(
                 "Cannot connect to Ollama. Make sure it's running: 'ollama serve'"
             )
+        except asyncio.TimeoutError:
+            return self._error_response("Ollama request timed out after 30 seconds")
         except Exception as e:
             return self._error_response(f"Ollama error: {str(e)}")
     
@@ -142,63 +412,43 @@ class ShellAIAssistant:
     
     def display_suggestion(self, suggestion: Dict) -> None:
         """Display the command suggestion in a nice format"""
-        print(f"\n{Fore.CYAN}{'='*60}")
-        print(f"{Fore.CYAN}🤖 AI COMMAND SUGGESTION")
-        print(f"{Fore.CYAN}{'='*60}")
-        
-        # Command
-        print(f"\n{Fore.GREEN}💻 Command:")
-        print(f"   {Fore.WHITE}{suggestion['command']}")
-        
-        # Explanation
-        print(f"\n{Fore.BLUE}📝 Explanation:")
-        print(f"   {Fore.WHITE}{suggestion['explanation']}")
+        parts = [
+            _PANEL_HEADER,
+            _COMMAND_LABEL, f"   {Fore.WHITE}{suggestion['command']}",
+            _EXPLANATION_LABEL, f"   {Fore.WHITE}{suggestion['explanation']}",
+        ]
         
         # Risks
         if suggestion.get('risks'):
-            print(f"\n{Fore.YELLOW}⚠️  Potential Issues:")
-            for risk in suggestion['risks']:
-                print(f"   {Fore.YELLOW}• {risk}")
+            parts.append(_RISKS_LABEL)
+            parts.extend(f"   {Fore.YELLOW}• {risk}" for risk in suggestion['risks'])
         
         # Alternatives
         if suggestion.get('alternatives'):
-            print(f"\n{Fore.MAGENTA}🔄 Alternatives:")
-            for i, alt in enumerate(suggestion['alternatives'], 1):
-                print(f"   {Fore.WHITE}{i}. {alt}")
+            parts.append(_ALTERNATIVES_LABEL)
+            parts.extend(f"   {Fore.WHITE}{i}. {alt}"
+                         for i, alt in enumerate(suggestion['alternatives'], 1))
         
         # Safety indicator
         if suggestion.get('safe_to_auto_execute', False):
-            safety = f"{Fore.GREEN}✅ SAFE"
+            parts.append(_SAFETY_SAFE)
         else:
-            safety = f"{Fore.RED}🚨 REQUIRES CAUTION"
+            parts.append(_SAFETY_CAUTION)
+        parts.append(_PANEL_FOOTER)
         
-        print(f"\n{Fore.CYAN}🛡️  Safety: {safety}")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+        # One buffered write for the whole panel instead of a write per line
+        sys.stdout.write("\n".join(parts) + "\n")
+        sys.stdout.flush()
     
     def get_user_choice(self, suggestion: Dict) -> str:
         """Get user's choice on what to do with the suggestion"""
-        safe = suggestion.get('safe_to_auto_execute', False)
+        prompt = _PROMPT_SAFE if suggestion.get('safe_to_auto_execute', False) else _PROMPT_UNSAFE
         
         while True:
-            if safe:
-                prompt = f"\n{Fore.CYAN}Choose: [y]es, [n]o, [e]dit, [a]lternatives, [q]uit: {Style.RESET_ALL}"
-            else:
-                prompt = f"\n{Fore.YELLOW}⚠️  CAUTION REQUIRED ⚠️\nChoose: [y]es (I understand risks), [n]o, [e]dit, [a]lternatives, [q]uit: {Style.RESET_ALL}"
-            
-            choice = input(prompt).lower().strip()
-            
-            if choice in ['y', 'yes']:
-                return 'execute'
-            elif choice in ['n', 'no']:
-                return 'cancel'
-            elif choice in ['e', 'edit']:
-                return 'edit'
-            elif choice in ['a', 'alternatives']:
-                return 'alternatives'
-            elif choice in ['q', 'quit']:
-                return 'quit'
-            else:
-                print(f"{Fore.RED}Invalid choice. Please try again.{Style.RESET_ALL}")
+            choice = _CHOICE_KEYS.get(_read_key(prompt).lower())
+            if choice:
+                return choice
+            print(_INVALID_CHOICE)
     
     def execute_command(self, command: str, safe: bool = False) -> bool:
         """Execute the command using the executor"""
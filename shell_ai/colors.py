@@ -0,0 +1,21 @@
+"""
+Terminal colors for Shell AI Assistant
+Uses colorama on a TTY and plain strings when output is redirected
+"""
+
+import sys
+from colorama import Fore as _Fore, Style as _Style, init
+
+class _NoColor:
+    """Stand-in for colorama's Fore/Style where every code is empty"""
+    
+    def __getattr__(self, name: str) -> str:
+        return ''
+
+if sys.stdout.isatty():
+    # Initialize colorama for cross-platform colored output
+    init(autoreset=True)
+    Fore, Style = _Fore, _Style
+else:
+    # Piped or redirected: skip colorama's stdout wrapper and escape codes
+    Fore = Style = _NoColor()
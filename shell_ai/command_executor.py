@@ -4,13 +4,172 @@ Handles safe command execution with proper error handling
 """
 
 import os
+import sys
+import locale
 import subprocess
 import re
+import shlex
+import functools
+import threading
+from collections import deque
 from typing import Dict, Tuple, Optional, List
-from colorama import Fore, Style, init
 
-# Initialize colorama for cross-platform colored output
-init(autoreset=True)
+from .colors import Fore, Style
+
+try:
+    import hyperscan
+except ImportError:  # Optional; the precompiled regexes are used instead
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional; plain substring checks are used instead
+    ahocorasick = None
+
+# Precomputed colored fragments for format_output; labels followed by raw
+# command output end with a reset so the output itself stays uncolored
+_DRY_RUN_LABEL = f"{Fore.BLUE}🔍 DRY RUN"
+_EXECUTING_LABEL = f"\n{Fore.CYAN}🔄 Executing: {Fore.WHITE}"
+_WARNING_PREFIX = f"{Fore.YELLOW}⚠️  "
+_OUTPUT_LABEL = f"\n{Fore.GREEN}📤 Output:{Style.RESET_ALL}"
+_ERROR_LABEL = f"\n{Fore.RED}❌ Error:{Style.RESET_ALL}"
+_SUCCESS_STATUS = f"\n{Fore.GREEN}✅ Command completed successfully"
+_FAILURE_STATUS = f"\n{Fore.RED}❌ Command failed with exit code: "
+
+# Characters that need a real shell (operators, expansion, globbing,
+# comments, assignments); commands without them can skip /bin/sh
+_SHELL_META = frozenset('|&;<>`$(){}*?[]~#=!\n')
+
+# Keywords that classify error output in suggest_fix
+ERROR_KEYWORDS = (
+    'command not found',
+    'permission denied',
+    'no such file or directory',
+    'apt', 'yum', 'dnf', 'brew',
+    'lock',
+    'not found',
+    'not a git repository',
+    'merge conflict',
+    'modulenotfounderror',
+    'syntaxerror',
+)
+
+def _build_hs_database(patterns: List[str]):
+    """Compile patterns into a Hyperscan block-mode database, if available"""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=[p.encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+        )
+        return db
+    except Exception:
+        return None
+
+def _build_automaton(words):
+    """Build an Aho-Corasick automaton over literal words, if available"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+def _hs_scan(db, text: str) -> List[int]:
+    """Scan text once and return the sorted ids of every matching pattern"""
+    hits = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        hits.add(pattern_id)
+    
+    db.scan(text.encode(), match_event_handler=on_match)
+    return sorted(hits)
+
+# Bytes requested per read() while draining command output
+_READ_CHUNK = 64 * 1024
+
+# Encoding used to decode command output, matching what text=True would use
+_OUTPUT_ENCODING = locale.getpreferredencoding(False)
+
+class _TailReader(threading.Thread):
+    """Drain a pipe in the background, keeping only its last bytes
+    
+    Output is read in fixed-size chunks into a ring buffer capped at
+    max_bytes, so memory stays bounded even for a single huge line;
+    text() additionally keeps at most max_lines of what remains.
+    """
+    
+    def __init__(self, pipe, max_bytes: int, max_lines: int):
+        super().__init__(daemon=True)
+        self.pipe = pipe
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.chunks = deque()
+        self.size = 0
+        self.dropped = 0
+        # Guards chunks/size/dropped, since text() may run while a reader
+        # that outlived its join timeout is still appending
+        self.lock = threading.Lock()
+        self.start()
+    
+    def run(self) -> None:
+        try:
+            while True:
+                chunk = self.pipe.read(_READ_CHUNK)
+                if not chunk:
+                    break
+                with self.lock:
+                    self._append(chunk)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.pipe.close()
+    
+    def _append(self, chunk: bytes) -> None:
+        """Add chunk, dropping the oldest bytes beyond max_bytes"""
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        excess = self.size - self.max_bytes
+        while excess > 0:
+            head = self.chunks[0]
+            if len(head) <= excess:
+                self.chunks.popleft()
+                cut = len(head)
+            else:
+                self.chunks[0] = head[excess:]
+                cut = excess
+            self.size -= cut
+            self.dropped += cut
+            excess -= cut
+    
+    def finish(self, timeout: float) -> None:
+        """Wait up to timeout for EOF, then release the pipe if drained"""
+        self.join(timeout=timeout)
+        # A reader still blocked in read() must keep its descriptor open, or
+        # the number could be reused under it; leave it to the daemon thread
+        if not self.is_alive():
+            self.pipe.close()
+    
+    def text(self) -> str:
+        """Return the retained output, noting any truncation"""
+        with self.lock:
+            data = b''.join(list(self.chunks))
+            dropped = self.dropped
+        output = data.decode(_OUTPUT_ENCODING, errors='replace')
+        
+        lines = output.splitlines(keepends=True)
+        if len(lines) > self.max_lines:
+            output = ''.join(lines[-self.max_lines:])
+            if not dropped:
+                return f"[... {len(lines) - self.max_lines} earlier lines truncated ...]\n{output}"
+        if dropped:
+            output = f"[... earlier output truncated ({dropped} bytes) ...]\n{output}"
+        return output
 
 class CommandExecutor:
     """Execute shell commands safely with proper validation"""
@@ -29,6 +188,34 @@ class CommandExecutor:
         r':\(\)\s*\{.*\}',         # Fork bomb
     ]
     
+    # All dangerous patterns folded into one alternation, so a safe command
+    # is rejected with a single scan instead of one search per pattern
+    _DANGEROUS_RE = re.compile(
+        "|".join(f"(?:{p})" for p in DANGEROUS_PATTERNS),
+        re.IGNORECASE
+    )
+    
+    # Each pattern compiled on its own, to list every pattern a command hits
+    # without going through the re module's global cache
+    _COMPILED_DANGEROUS = tuple(
+        (re.compile(p, re.IGNORECASE), p) for p in DANGEROUS_PATTERNS
+    )
+    
+    # Hyperscan databases report every matching id in one pass (None if the
+    # hyperscan package is not installed)
+    _DANGEROUS_HS = _build_hs_database(DANGEROUS_PATTERNS)
+    _ERROR_HS = _build_hs_database([re.escape(k) for k in ERROR_KEYWORDS])
+    
+    # Single-pass keyword automaton used when Hyperscan is unavailable
+    _ERROR_AC = _build_automaton(ERROR_KEYWORDS) if _ERROR_HS is None else None
+    
+    # Seconds before a running command is killed
+    TIMEOUT = 30
+    
+    # Tail of stdout/stderr kept per command; earlier output is dropped
+    MAX_OUTPUT_BYTES = 10 * 1024 * 1024
+    MAX_OUTPUT_LINES = 10000
+    
     def __init__(self, config: Optional[Dict] = None):
         """Initialize executor with optional configuration"""
         self.config = config or {}
@@ -36,39 +223,57 @@ class CommandExecutor:
         
     def is_dangerous(self, command: str) -> Tuple[bool, List[str]]:
         """Check if command matches dangerous patterns"""
-        risks = []
-        
-        # Check against dangerous patterns
-        for pattern in self.DANGEROUS_PATTERNS:
-            if re.search(pattern, command, re.IGNORECASE):
-                risks.append(f"Matches dangerous pattern: {pattern}")
-        
-        # Check for sudo
-        if command.strip().startswith('sudo'):
-            risks.append("Requires root/admin privileges")
-        
-        # Check for redirects that might overwrite files
-        if '>' in command and not '>>' in command:
-            risks.append("May overwrite existing files")
-        
-        # Check for pipe to shell
-        if '|' in command and any(shell in command for shell in ['bash', 'sh', 'zsh']):
-            risks.append("Pipes to shell - could execute arbitrary code")
-        
-        return len(risks) > 0, risks
+        dangerous, risks = _is_dangerous_cached(command)
+        return dangerous, list(risks)
     
     def validate_command(self, command: str) -> Tuple[bool, str]:
         """Validate command before execution"""
-        if not command or not command.strip():
-            return False, "Empty command"
+        return _validate_command_cached(command)
+    
+    @staticmethod
+    def _simple_argv(command: str) -> Optional[List[str]]:
+        """Split command into argv if it uses no shell features, else None"""
+        if _SHELL_META.intersection(command):
+            return None
+        try:
+            argv = shlex.split(command)
+        except ValueError:
+            return None
+        return argv or None
+    
+    def _run_process(self, args, shell: bool) -> Tuple[int, str, str]:
+        """Run a process and return (returncode, stdout, stderr)
         
-        # Check for shell injection attempts
-        dangerous_chars = ['`', '$(...)', '${...}']
-        for char in dangerous_chars:
-            if char in command:
-                return False, f"Potential shell injection: contains {char}"
+        Output is drained in chunks into byte-capped buffers rather than
+        captured whole, so memory stays flat for huge outputs. Raises
+        subprocess.TimeoutExpired (after killing the process) on timeout.
+        """
+        process = subprocess.Popen(
+            args,
+            shell=shell,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            cwd=os.getcwd()
+        )
+        stdout = _TailReader(process.stdout, self.MAX_OUTPUT_BYTES, self.MAX_OUTPUT_LINES)
+        stderr = _TailReader(process.stderr, self.MAX_OUTPUT_BYTES, self.MAX_OUTPUT_LINES)
         
-        return True, "Valid"
+        try:
+            process.wait(timeout=self.TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            stdout.finish(timeout=1)
+            stderr.finish(timeout=1)
+            raise
+        
+        # Readers finish once the pipes hit EOF; the timeout guards against
+        # background children that inherited and still hold the pipes
+        stdout.finish(timeout=1)
+        stderr.finish(timeout=1)
+        return process.returncode, stdout.text(), stderr.text()
     
     def execute(self, command: str, dry_run: bool = False) -> Dict[str, any]:
         """Execute a command and return results"""
@@ -103,20 +308,25 @@ class CommandExecutor:
         
         try:
             # Execute command
-            process = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=os.getcwd(),
-                timeout=30  # 30 second timeout
-            )
+            # Commands without shell syntax are exec'd directly, saving the
+            # intermediate /bin/sh; builtins and missing programs fall back
+            # to the shell so its usual error messages are preserved
+            outcome = None
+            argv = self._simple_argv(command)
+            if argv is not None:
+                try:
+                    outcome = self._run_process(argv, shell=False)
+                except OSError:
+                    outcome = None
+            if outcome is None:
+                outcome = self._run_process(command, shell=True)
             
+            returncode, stdout, stderr = outcome
             result.update({
-                'success': process.returncode == 0,
-                'stdout': process.stdout,
-                'stderr': process.stderr,
-                'returncode': process.returncode
+                'success': returncode == 0,
+                'stdout': stdout,
+                'stderr': stderr,
+                'returncode': returncode
             })
             
             # Add to history
@@ -126,7 +336,7 @@ class CommandExecutor:
             result.update({
                 'success': False,
                 'stdout': '',
-                'stderr': 'Command timed out after 30 seconds',
+                'stderr': f'Command timed out after {self.TIMEOUT} seconds',
                 'returncode': -1
             })
         except Exception as e:
@@ -167,33 +377,34 @@ class CommandExecutor:
     def format_output(self, result: Dict[str, any]) -> None:
         """Pretty print command execution results"""
         if result.get('dry_run'):
-            print(f"{Fore.BLUE}🔍 DRY RUN")
-            print(f"{Fore.WHITE}{result['stdout']}")
-            return
-        
-        # Command
-        print(f"\n{Fore.CYAN}🔄 Executing: {Fore.WHITE}{result['command']}")
-        
-        # Warnings
-        if result.get('risks'):
-            for risk in result['risks']:
-                print(f"{Fore.YELLOW}⚠️  {risk}")
-        
-        # Output
-        if result['stdout']:
-            print(f"\n{Fore.GREEN}📤 Output:")
-            print(result['stdout'])
-        
-        # Errors
-        if result['stderr']:
-            print(f"\n{Fore.RED}❌ Error:")
-            print(result['stderr'])
-        
-        # Status
-        if result['success']:
-            print(f"\n{Fore.GREEN}✅ Command completed successfully")
+            parts = [_DRY_RUN_LABEL, f"{Fore.WHITE}{result['stdout']}"]
         else:
-            print(f"\n{Fore.RED}❌ Command failed with exit code: {result['returncode']}")
+            # Command
+            parts = [f"{_EXECUTING_LABEL}{result['command']}"]
+            
+            # Warnings
+            if result.get('risks'):
+                parts.extend(f"{_WARNING_PREFIX}{risk}" for risk in result['risks'])
+            
+            # Output
+            if result['stdout']:
+                parts.append(_OUTPUT_LABEL)
+                parts.append(result['stdout'])
+            
+            # Errors
+            if result['stderr']:
+                parts.append(_ERROR_LABEL)
+                parts.append(result['stderr'])
+            
+            # Status
+            if result['success']:
+                parts.append(_SUCCESS_STATUS)
+            else:
+                parts.append(f"{_FAILURE_STATUS}{result['returncode']}")
+        
+        # One buffered write for the whole block instead of a write per line
+        sys.stdout.write("\n".join(parts) + f"{Style.RESET_ALL}\n")
+        sys.stdout.flush()
     
     def get_last_error(self) -> Optional[Dict[str, any]]:
         """Get the last command that failed"""
@@ -202,56 +413,65 @@ class CommandExecutor:
                 return cmd
         return None
     
+    def _error_keywords(self, error_text: str) -> set:
+        """Return the ERROR_KEYWORDS present in error_text"""
+        if self._ERROR_HS is not None:
+            return {ERROR_KEYWORDS[i] for i in _hs_scan(self._ERROR_HS, error_text)}
+        if self._ERROR_AC is not None:
+            return {keyword for _, keyword in self._ERROR_AC.iter(error_text)}
+        return {k for k in ERROR_KEYWORDS if k in error_text}
+    
     def suggest_fix(self, error_result: Dict[str, any]) -> List[str]:
         """Suggest potential fixes for common errors"""
         suggestions = []
         error_text = error_result.get('stderr', '').lower()
         command = error_result.get('command', '')
+        hits = self._error_keywords(error_text)
         
         # Command not found
-        if 'command not found' in error_text:
+        if 'command not found' in hits:
             cmd_name = command.split()[0]
             suggestions.append(f"Install {cmd_name} using your package manager")
             suggestions.append(f"Check if {cmd_name} is in your PATH")
             suggestions.append("Check for typos in the command name")
         
         # Permission denied
-        elif 'permission denied' in error_text:
+        elif 'permission denied' in hits:
             suggestions.append(f"Try with sudo: sudo {command}")
             suggestions.append("Check file permissions with ls -l")
             suggestions.append("Ensure you have access to the file/directory")
         
         # No such file or directory
-        elif 'no such file or directory' in error_text:
+        elif 'no such file or directory' in hits:
             suggestions.append("Check if the file/directory exists")
             suggestions.append("Verify the path is correct")
             suggestions.append("Use tab completion to verify paths")
         
         # Package management errors
-        elif any(pkg in error_text for pkg in ['apt', 'yum', 'dnf', 'brew']):
-            if 'lock' in error_text:
+        elif hits & {'apt', 'yum', 'dnf', 'brew'}:
+            if 'lock' in hits:
                 suggestions.append("Another package manager is running")
                 suggestions.append("Wait for it to finish or kill the process")
-            elif 'not found' in error_text:
+            elif 'not found' in hits:
                 suggestions.append("Update package lists first")
                 suggestions.append("Check package name spelling")
         
         # Git errors
         elif 'git' in command:
-            if 'not a git repository' in error_text:
+            if 'not a git repository' in hits:
                 suggestions.append("Initialize a git repository: git init")
                 suggestions.append("Clone an existing repository")
-            elif 'merge conflict' in error_text:
+            elif 'merge conflict' in hits:
                 suggestions.append("Resolve conflicts manually")
                 suggestions.append("Use git status to see conflicted files")
         
         # Python errors
         elif 'python' in command or 'pip' in command:
-            if 'modulenotfounderror' in error_text:
+            if 'modulenotfounderror' in hits:
                 module = re.search(r"No module named '([^']+)'", error_result.get('stderr', ''))
                 if module:
                     suggestions.append(f"Install missing module: pip install {module.group(1)}")
-            elif 'syntaxerror' in error_text:
+            elif 'syntaxerror' in hits:
                 suggestions.append("Check Python syntax")
                 suggestions.append("Verify Python version compatibility")
         
@@ -260,21 +480,85 @@ class CommandExecutor:
     @staticmethod
     def clean_command(command: str) -> str:
         """Clean and normalize command string"""
-        # Remove leading/trailing whitespace
-        command = command.strip()
-        
-        # Remove multiple spaces
-        command = ' '.join(command.split())
-        
-        # Handle common typos
-        replacements = {
-            'ls-la': 'ls -la',
-            'cd~': 'cd ~',
-            'cd..': 'cd ..',
-            'rm-rf': 'rm -rf',
-        }
-        
-        for typo, correct in replacements.items():
-            command = command.replace(typo, correct)
-        
-        return command
\ No newline at end of file
+        return _clean_command_cached(command)
+
+
+# Literals at least one of which appears in any command is_dangerous flags:
+# a required substring of each DANGEROUS_PATTERNS entry (matched
+# case-insensitively) plus the sudo, redirect and pipe checks
+_DANGER_NEEDLES = ('rm', 'dd', 'mkfs', '>', 'chmod', 'chown', 'curl', 'wget', ':(', 'sudo', '|')
+
+# Whitespace collapsing and typo fixes used by clean_command
+_WHITESPACE_RE = re.compile(r'\s+')
+_TYPO_FIXES = {
+    'ls-la': 'ls -la',
+    'cd~': 'cd ~',
+    'cd..': 'cd ..',
+    'rm-rf': 'rm -rf',
+}
+_TYPOS_RE = re.compile('|'.join(re.escape(typo) for typo in _TYPO_FIXES))
+
+# The checks below are pure functions of the command string and run several
+# times per request (confirmation, validation, execution), so they are
+# memoized at module level and the CommandExecutor methods delegate to them.
+# Results must stay immutable: risks are cached as a tuple.
+
+@functools.lru_cache(maxsize=2048)
+def _is_dangerous_cached(command: str) -> Tuple[bool, Tuple[str, ...]]:
+    """Cached implementation of CommandExecutor.is_dangerous"""
+    # Preflight: every check below needs one of these literals, so ordinary
+    # commands (ls, cd, git status) skip the regex scans entirely
+    lowered = command.lower()
+    if not any(needle in lowered for needle in _DANGER_NEEDLES):
+        return False, ()
+    
+    risks = []
+    
+    # Check against dangerous patterns. Hyperscan reports every matching
+    # pattern in one pass; the combined regex only reports the leftmost
+    # match, so on a hit re-check each pattern to list every one that applies
+    if CommandExecutor._DANGEROUS_HS is not None:
+        for pattern_id in _hs_scan(CommandExecutor._DANGEROUS_HS, command):
+            risks.append(f"Matches dangerous pattern: {CommandExecutor.DANGEROUS_PATTERNS[pattern_id]}")
+    elif CommandExecutor._DANGEROUS_RE.search(command):
+        for compiled, pattern in CommandExecutor._COMPILED_DANGEROUS:
+            if compiled.search(command):
+                risks.append(f"Matches dangerous pattern: {pattern}")
+    
+    # Check for sudo
+    if command.strip().startswith('sudo'):
+        risks.append("Requires root/admin privileges")
+    
+    # Check for redirects that might overwrite files
+    if '>' in command and not '>>' in command:
+        risks.append("May overwrite existing files")
+    
+    # Check for pipe to shell
+    if '|' in command and any(shell in command for shell in ['bash', 'sh', 'zsh']):
+        risks.append("Pipes to shell - could execute arbitrary code")
+    
+    return len(risks) > 0, tuple(risks)
+
+@functools.lru_cache(maxsize=2048)
+def _validate_command_cached(command: str) -> Tuple[bool, str]:
+    """Cached implementation of CommandExecutor.validate_command"""
+    if not command or not command.strip():
+        return False, "Empty command"
+    
+    # Check for shell injection attempts
+    dangerous_chars = ['`', '$(...)', '${...}']
+    for char in dangerous_chars:
+        if char in command:
+            return False, f"Potential shell injection: contains {char}"
+    
+    return True, "Valid"
+
+@functools.lru_cache(maxsize=2048)
+def _clean_command_cached(command: str) -> str:
+    """Cached implementation of CommandExecutor.clean_command"""
+    # Trim and collapse runs of whitespace in one pass
+    command = _WHITESPACE_RE.sub(' ', command.strip())
+    
+    # Handle common typos
+    return _TYPOS_RE.sub(lambda m: _TYPO_FIXES[m.group(0)], command)
+
@@ -4,21 +4,73 @@ Handles both OpenAI and Ollama configurations
 """
 
 import os
-import json
-from typing import Dict, Optional
+import copy
+import stat
+import tempfile
+import functools
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
 from pathlib import Path
 
+from .jsonio import loads, dumps
+
+# Parsed config files keyed by path: (st_mtime_ns, defaults merged with file)
+_CONFIG_CACHE: Dict[str, Tuple[int, Dict]] = {}
+
+# Shared HTTP session for Ollama probes, created on first use
+_SESSION = None
+
+def _get_session():
+    """Get the pooled requests session used to probe Ollama"""
+    global _SESSION
+    if _SESSION is None:
+        # Imported lazily: only the Ollama validation path needs requests
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        _SESSION = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        _SESSION.mount("http://", adapter)
+        _SESSION.mount("https://", adapter)
+    return _SESSION
+
+@functools.lru_cache(maxsize=128)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """Split a dot-notation config key into its path segments"""
+    return tuple(key.split('.'))
+
+def _freeze(value: Any) -> Any:
+    """Build a read-only view of nested dicts/lists (dicts -> proxies, lists -> tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+# Environment variable -> (config section, key); section None is top level
+_ENV_MAP = (
+    # Provider selection
+    ("SHELL_AI_PROVIDER", (None, "provider")),
+    # OpenAI settings
+    ("OPENAI_API_KEY", ("openai", "api_key")),
+    ("OPENAI_MODEL", ("openai", "model")),
+    # Ollama settings
+    ("OLLAMA_HOST", ("ollama", "host")),
+    ("OLLAMA_MODEL", ("ollama", "model")),
+)
+
 class Config:
     """Configuration manager for Shell AI Assistant"""
     
-    # Default configurations
-    DEFAULTS = {
+    # Default configurations; internal only, never mutated (instances deep-copy it)
+    DEFAULTS_RAW = {
         "provider": "openai",
         "openai": {
             "api_key": None,
             "model": "gpt-4",
             "temperature": 0.1,
-            "max_tokens": 1000
+            "max_tokens": 1000,
+            "json_mode": None  # None: auto-detect from the model name
         },
         "ollama": {
             "host": "http://localhost:11434",
@@ -55,72 +107,122 @@ class Config:
         }
     }
     
+    # Read-only view of the defaults for outside readers
+    DEFAULTS = _freeze(DEFAULTS_RAW)
+    
     def __init__(self, config_file: Optional[str] = None):
         """Initialize configuration"""
         self.config_file = config_file or os.path.expanduser("~/.shell_ai_config.json")
         self.config = self._load_config()
         
+        # Resolved provider/model, cleared by set() when they may change
+        self._provider_cache = None
+        self._model_cache = None
+        
     def _load_config(self) -> Dict:
         """Load configuration from file and environment"""
-        # Start with defaults
-        config = self.DEFAULTS.copy()
-        
-        # Load from JSON file if exists
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    file_config = json.load(f)
-                    self._deep_merge(config, file_config)
-            except Exception as e:
-                print(f"Warning: Could not load config file: {e}")
+        # Start with defaults merged with the config file, copied so this
+        # instance never shares nested dicts with DEFAULTS_RAW or the cache;
+        # after this, self.config is changed only through set()
+        config = copy.deepcopy(self._load_file_config())
         
         # Override with environment variables
         self._load_env_vars(config)
         
         return config
     
+    def _load_file_config(self) -> Dict:
+        """Get defaults merged with the JSON config file
+        
+        The merged result is cached per path and reused while the file's
+        mtime is unchanged. Callers must not mutate the returned dict.
+        """
+        try:
+            mtime_ns = os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return self.DEFAULTS_RAW
+        
+        cached = _CONFIG_CACHE.get(self.config_file)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        
+        config = copy.deepcopy(self.DEFAULTS_RAW)
+        try:
+            with open(self.config_file, 'rb') as f:
+                # Key the cache on the file actually read, not the earlier stat
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                file_config = loads(f.read())
+            self._deep_merge(config, file_config)
+        except FileNotFoundError:
+            # Removed since the stat above: same as having no config file
+            return self.DEFAULTS_RAW
+        except Exception as e:
+            print(f"Warning: Could not load config file: {e}")
+            return config
+        
+        _CONFIG_CACHE[self.config_file] = (mtime_ns, config)
+        return config
+    
     def _deep_merge(self, base: Dict, update: Dict) -> None:
         """Deep merge two dictionaries"""
-        for key, value in update.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                self._deep_merge(base[key], value)
-            else:
-                base[key] = value
+        # Iterative worklist instead of recursion: one frame for any depth
+        stack = [(base, update)]
+        while stack:
+            b, u = stack.pop()
+            for key, value in u.items():
+                base_value = b.get(key)
+                if type(value) is dict and type(base_value) is dict:
+                    stack.append((base_value, value))
+                else:
+                    b[key] = value
     
     def _load_env_vars(self, config: Dict) -> None:
         """Load configuration from environment variables"""
-        # Provider selection
-        if os.getenv("SHELL_AI_PROVIDER"):
-            config["provider"] = os.getenv("SHELL_AI_PROVIDER")
-        
-        # OpenAI settings
-        if os.getenv("OPENAI_API_KEY"):
-            config["openai"]["api_key"] = os.getenv("OPENAI_API_KEY")
-        if os.getenv("OPENAI_MODEL"):
-            config["openai"]["model"] = os.getenv("OPENAI_MODEL")
-        
-        # Ollama settings
-        if os.getenv("OLLAMA_HOST"):
-            config["ollama"]["host"] = os.getenv("OLLAMA_HOST")
-        if os.getenv("OLLAMA_MODEL"):
-            config["ollama"]["model"] = os.getenv("OLLAMA_MODEL")
+        env = os.environ
+        for var, (section, key) in _ENV_MAP:
+            value = env.get(var)
+            if value:
+                target = config[section] if section else config
+                target[key] = value
     
     def save(self) -> None:
         """Save current configuration to file"""
         try:
-            # Don't save sensitive data
-            save_config = self.config.copy()
+            # Don't save sensitive data; copy so the in-memory key survives
+            save_config = dict(self.config)
             if "openai" in save_config and "api_key" in save_config["openai"]:
+                save_config["openai"] = copy.deepcopy(save_config["openai"])
                 save_config["openai"]["api_key"] = "***"
             
-            with open(self.config_file, 'w') as f:
-                json.dump(save_config, f, indent=2)
+            # Write a uniquely named temp file next to the real target (so a
+            # symlinked config stays a symlink) and swap it in; a crash or a
+            # concurrent save never leaves a truncated config behind
+            target = os.path.realpath(self.config_file)
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(target),
+                                            prefix=os.path.basename(target) + ".")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(dumps(save_config))
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp creates the file 0600; keep an existing config's mode
+                try:
+                    os.chmod(tmp_file, stat.S_IMODE(os.stat(target).st_mode))
+                except FileNotFoundError:
+                    pass
+                os.replace(tmp_file, target)
+            except BaseException:
+                os.unlink(tmp_file)
+                raise
         except Exception as e:
             print(f"Warning: Could not save config: {e}")
     
     def get(self, key: str, default=None):
         """Get configuration value using dot notation"""
-        keys = key.split('.')
+        keys = _split_key(key)
+        if len(keys) == 1:
+            return self.config.get(key, default)
+        
         value = self.config
         
         for k in keys:
@@ -133,7 +235,7 @@ class Config:
     
     def set(self, key: str, value) -> None:
         """Set configuration value using dot notation"""
-        keys = key.split('.')
+        keys = _split_key(key)
         config = self.config
         
         for k in keys[:-1]:
@@ -142,11 +244,17 @@ class Config:
             config = config[k]
         
         config[keys[-1]] = value
+        
+        if keys[0] in ("provider", "openai", "ollama"):
+            self._provider_cache = None
+            self._model_cache = None
     
     @property
     def provider(self) -> str:
         """Get current AI provider"""
-        return self.config.get("provider", "openai")
+        if self._provider_cache is None:
+            self._provider_cache = self.config.get("provider", "openai")
+        return self._provider_cache
     
     @property
     def is_openai(self) -> bool:
@@ -161,10 +269,12 @@ class Config:
     @property
     def model(self) -> str:
         """Get current model based on provider"""
-        if self.is_openai:
-            return self.config["openai"]["model"]
-        else:
-            return self.config["ollama"]["model"]
+        if self._model_cache is None:
+            if self.is_openai:
+                self._model_cache = self.config["openai"]["model"]
+            else:
+                self._model_cache = self.config["ollama"]["model"]
+        return self._model_cache
     
     @property
     def api_key(self) -> Optional[str]:
@@ -189,8 +299,7 @@ class Config:
         elif self.is_ollama:
             # Check if Ollama is accessible
             try:
-                import requests
-                response = requests.get(f"{self.ollama_host}/api/tags", timeout=2)
+                response = _get_session().get(f"{self.ollama_host}/api/tags", timeout=2)
                 if response.status_code != 200:
                     print(f"Error: Cannot connect to Ollama at {self.ollama_host}")
                     print("Make sure Ollama is running: 'ollama serve'")
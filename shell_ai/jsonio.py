@@ -0,0 +1,36 @@
+"""
+JSON encoding for Shell AI Assistant
+Uses orjson when installed and falls back to the stdlib json module
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib json module is used instead
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    loads = orjson.loads
+    
+    def dumps(obj: Any) -> str:
+        """Serialize obj as indented JSON text (for files)"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    
+    def dumpb(obj: Any) -> bytes:
+        """Serialize obj as compact UTF-8 JSON (for request bodies)"""
+        return orjson.dumps(obj)
+else:
+    loads = json.loads
+    
+    def dumps(obj: Any) -> str:
+        """Serialize obj as indented JSON text (for files)"""
+        return json.dumps(obj, indent=2)
+    
+    def dumpb(obj: Any) -> bytes:
+        """Serialize obj as compact UTF-8 JSON (for request bodies)"""
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
@@ -6,32 +6,32 @@ Main entry point for the application
 
 import sys
 import os
-from colorama import Fore, Style, init
+from typing import TYPE_CHECKING
 import click
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # Running as a script: add parent directory to path for imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from shell_ai.colors import Fore, Style
 from shell_ai.config import Config
-from shell_ai.assistant import ShellAIAssistant
-from shell_ai.system_info import SystemInfo
 
-# Initialize colorama
-init(autoreset=True)
+if TYPE_CHECKING:
+    from shell_ai.assistant import ShellAIAssistant
 
-def print_banner():
-    """Print welcome banner"""
-    banner = f"""
+# Special REPL commands (compared against the lowercased input)
+_EXIT_CMDS = frozenset({'quit', 'exit', 'bye'})
+_HELP_CMDS = frozenset({'help', '?'})
+
+# Interactive screens and prompt, formatted once at import
+_BANNER = f"""
 {Fore.CYAN}╔═══════════════════════════════════════════════════════════╗
 ║                  🤖 Shell AI Assistant 🤖                  ║
 ║           Natural Language → Shell Commands               ║
 ╚═══════════════════════════════════════════════════════════╝{Style.RESET_ALL}
 """
-    print(banner)
 
-def print_help():
-    """Print help information"""
-    help_text = f"""
+_HELP_TEXT = f"""
 {Fore.CYAN}💡 Usage Tips:{Style.RESET_ALL}
 • Type requests in natural language (e.g., "create a backup of my home directory")
 • Start with '/' to run commands directly (e.g., '/ls -la')
@@ -50,9 +50,18 @@ def print_help():
 • ai-pkg "query"   - Package management help
 • ai-git "query"   - Git repository assistance
 """
-    print(help_text)
 
-def run_interactive_session(assistant: ShellAIAssistant):
+_PROMPT = f"\n{Fore.GREEN}🗣️  You: {Style.RESET_ALL}"
+
+def print_banner():
+    """Print welcome banner"""
+    print(_BANNER)
+
+def print_help():
+    """Print help information"""
+    print(_HELP_TEXT)
+
+def run_interactive_session(assistant: 'ShellAIAssistant'):
     """Run the main interactive loop"""
     print_banner()
     
@@ -67,26 +76,27 @@ def run_interactive_session(assistant: ShellAIAssistant):
     while True:
         try:
             # Get user input
-            user_input = input(f"\n{Fore.GREEN}🗣️  You: {Style.RESET_ALL}").strip()
+            user_input = input(_PROMPT).strip()
             
             # Handle special commands
-            if user_input.lower() in ['quit', 'exit', 'bye']:
+            lowered = user_input.lower()
+            if lowered in _EXIT_CMDS:
                 print(f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
                 break
             
-            elif user_input.lower() in ['help', '?']:
+            elif lowered in _HELP_CMDS:
                 print_help()
                 continue
             
-            elif user_input.lower() == 'clear':
+            elif lowered == 'clear':
                 os.system('clear' if os.name != 'nt' else 'cls')
                 print_banner()
                 continue
             
-            elif user_input.lower() == 'history':
+            elif lowered == 'history':
                 if assistant.conversation_history:
                     print(f"\n{Fore.CYAN}📜 Conversation History:{Style.RESET_ALL}")
-                    for i, msg in enumerate(assistant.conversation_history[-10:], 1):
+                    for i, msg in enumerate(assistant.recent_history(10), 1):
                         role_color = Fore.GREEN if msg['role'] == 'user' else Fore.BLUE
                         print(f"{i}. {role_color}{msg['role']}: {msg['content'][:80]}...")
                 else:
@@ -106,7 +116,7 @@ def run_interactive_session(assistant: ShellAIAssistant):
             print(f"\n{Fore.RED}❌ Unexpected error: {str(e)}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}Please try again or report this issue.{Style.RESET_ALL}")
 
-def process_single_query(assistant: ShellAIAssistant, query: str):
+def process_single_query(assistant: 'ShellAIAssistant', query: str):
     """Process a single query and exit"""
     try:
         assistant.process_request(query)
@@ -146,7 +156,9 @@ def main(query, provider, model, config, version):
     if not config_obj.validate():
         sys.exit(1)
     
-    # Create assistant
+    # Create assistant; imported here so --version and argument errors
+    # don't pay for loading the LLM client libraries
+    from shell_ai.assistant import ShellAIAssistant
     try:
         assistant = ShellAIAssistant(config_obj)
     except Exception as e:
@@ -154,13 +166,16 @@ def main(query, provider, model, config, version):
         sys.exit(1)
     
     # Process query or run interactive mode
-    if query:
-        # Join all arguments as a single query
-        query_str = ' '.join(query)
-        process_single_query(assistant, query_str)
-    else:
-        # Interactive mode
-        run_interactive_session(assistant)
+    try:
+        if query:
+            # Join all arguments as a single query
+            query_str = ' '.join(query)
+            process_single_query(assistant, query_str)
+        else:
+            # Interactive mode
+            run_interactive_session(assistant)
+    finally:
+        assistant.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
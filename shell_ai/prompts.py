@@ -3,31 +3,37 @@ AI prompt templates for Shell AI Assistant
 Optimized for both OpenAI and Ollama models
 """
 
+import os
+import re
 import platform
-from typing import Dict, Optional
+import functools
+from typing import Dict, Iterator, List, Optional, Tuple
 
-class PromptBuilder:
-    """Build context-aware prompts for AI models"""
-    
-    @staticmethod
-    def get_system_prompt(context: Dict) -> str:
-        """Build the main system prompt with environment context"""
-        os_info = context.get('os', platform.system())
-        distro = context.get('distro', 'Unknown')
-        shell = context.get('shell', 'bash')
-        user = context.get('user', 'user')
-        cwd = context.get('cwd', '/')
-        provider = context.get('provider', 'openai')
-        
-        # Adjust prompt based on provider
-        if provider == 'ollama':
-            # Ollama models often work better with more direct prompts
-            response_format = """
+from .jsonio import loads, JSONDecodeError
+
+@functools.lru_cache(maxsize=1)
+def _default_env() -> Dict[str, str]:
+    """Detect the process environment once, for context keys callers omit"""
+    return {
+        'os': platform.system(),
+        'shell': os.path.basename(os.environ.get('SHELL', 'bash')),
+        'user': os.environ.get('USER', 'user'),
+        'cwd': os.getcwd()
+    }
+
+@functools.lru_cache(maxsize=16)
+def _build_system_prompt(os_info: str, distro: str, shell: str, user: str,
+                         cwd: str, provider: str) -> str:
+    """Render the system prompt for one set of environment values"""
+    # Adjust prompt based on provider
+    if provider == 'ollama':
+        # Ollama models often work better with more direct prompts
+        response_format = """
 RESPONSE FORMAT (JSON only):
 {"command": "command", "explanation": "explanation", "risks": ["risks"], "alternatives": ["alt1", "alt2"], "safe_to_auto_execute": boolean}"""
-        else:
-            # OpenAI models handle detailed formatting well
-            response_format = """
+    else:
+        # OpenAI models handle detailed formatting well
+        response_format = """
 RESPONSE FORMAT (always use this exact JSON structure):
 {
     "command": "the actual shell command",
@@ -36,8 +42,8 @@ RESPONSE FORMAT (always use this exact JSON structure):
     "alternatives": ["alternative command 1", "alternative command 2"],
     "safe_to_auto_execute": true/false
 }"""
-        
-        return f"""You are a shell command assistant. Convert natural language requests to shell commands and help fix errors.
+    
+    return f"""You are a shell command assistant. Convert natural language requests to shell commands and help fix errors.
 
 ENVIRONMENT CONTEXT:
 - OS: {os_info}
@@ -75,6 +81,159 @@ SAFETY RULES:
   * Installs or removes software
   * Could cause data loss
   * Involves network operations with unknown endpoints"""
+
+# Markdown code fences around model output
+_FENCE_OPEN = re.compile(r'^```[a-z]*\n')
+_FENCE_CLOSE = re.compile(r'\n```$')
+
+# Scanner state: (cursor, start, depth, in_string, escaped); start is -1
+# until the opening bracket has been seen
+_SCAN_START = (0, -1, 0, False, False)
+
+def _scan_json(buf: str, state: Tuple = _SCAN_START, opener: str = '{') -> Tuple[int, Tuple]:
+    """Incrementally find the end of the first balanced JSON value in buf
+    
+    The value starts at the first opener ('{' for an object, '[' for an
+    array); quotes before it are ignored, so prose preambles can't confuse
+    the string tracking. Only text after the stored cursor is examined, which
+    keeps scanning a growing stream buffer O(1) amortized per character.
+    Returns (end, new_state), where end is one past the closing bracket or -1.
+    """
+    pos, start, depth, in_string, escaped = state
+    if start == -1:
+        start = buf.find(opener, pos)
+        if start == -1:
+            return -1, (len(buf), -1, 0, False, False)
+        pos = start
+    
+    end = len(buf)
+    while pos < end:
+        c = buf[pos]
+        pos += 1
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == '\\':
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in '{[':
+            depth += 1
+        elif c in '}]':
+            depth -= 1
+            if depth == 0:
+                return pos, (pos, start, depth, in_string, escaped)
+    
+    return -1, (pos, start, depth, in_string, escaped)
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Slice out the first balanced {...} object in text, if any"""
+    end, state = _scan_json(text)
+    return text[state[1]:end] if end != -1 else None
+
+def _json_array_spans(text: str) -> Iterator[str]:
+    """Yield every balanced [...] span in text, by start position"""
+    pos = 0
+    while True:
+        end, state = _scan_json(text, (pos, -1, 0, False, False), '[')
+        start = state[1]
+        if start == -1:
+            return
+        if end != -1:
+            yield text[start:end]
+        # Resume just past this opener, so arrays nested in a rejected span
+        # (or following an unclosed '[') are still found
+        pos = start + 1
+
+class JSONObjectScanner:
+    """Detect the first complete JSON object in text that arrives in chunks
+    
+    feed() each chunk of a streamed response as it comes in; it returns the
+    object's text once the closing '}' has been seen, and None until then.
+    The whole stream stays available as text.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self._state = _SCAN_START
+        self._object: Optional[str] = None
+    
+    def feed(self, chunk: str) -> Optional[str]:
+        """Append chunk and return the complete object, if one has closed"""
+        self.text += chunk
+        if self._object is None:
+            end, self._state = _scan_json(self.text, self._state)
+            if end != -1:
+                self._object = self.text[self._state[1]:end]
+        return self._object
+
+# Optional context sections appended by get_context_aware_prompt, in order
+_CONTEXT_LABELS = (
+    ('git_info', 'Git context'),
+    ('system_info', 'System info'),
+    ('directory_info', 'Directory context'),
+    ('package_manager', 'Package manager'),
+)
+
+# Model-specific prompt wrappers, keyed by model family
+_TEMPLATES = {
+    # DeepSeek models work well with structured thinking
+    'deepseek': """<thinking>
+Let me analyze this request step by step.
+</thinking>
+
+{prompt}
+
+Remember to respond with valid JSON only.""",
+    # Qwen models are good with direct instructions
+    'qwen': """{prompt}
+
+Output only valid JSON matching the specified format.""",
+    # Llama models benefit from examples
+    'llama': """{prompt}
+
+Example response:
+{{"command": "ls -la", "explanation": "Lists all files with details", "risks": [], "alternatives": ["ls -l", "ls -a"], "safe_to_auto_execute": true}}""",
+}
+
+@functools.lru_cache(maxsize=32)
+def _model_family(model: str) -> str:
+    """Map an Ollama model name to its _TEMPLATES family ('' if none)"""
+    model = model.lower()
+    for family in _TEMPLATES:
+        if family in model:
+            return family
+    return ''
+
+@functools.lru_cache(maxsize=len(_TEMPLATES))
+def _template_parts(family: str) -> Tuple[str, str]:
+    """Split a family's template into the text before and after {prompt}"""
+    # Formatting with a sentinel resolves the {{ }} escapes once
+    prefix, suffix = _TEMPLATES[family].format(prompt='\0').split('\0')
+    return prefix, suffix
+
+def _ollama_optimized_prompt(prompt: str, family: str) -> str:
+    """Wrap a prompt for one Ollama model family"""
+    prefix, suffix = _template_parts(family)
+    return prefix + prompt + suffix
+
+class PromptBuilder:
+    """Build context-aware prompts for AI models"""
+    
+    @staticmethod
+    def get_system_prompt(context: Dict) -> str:
+        """Build the main system prompt with environment context"""
+        env = _default_env()
+        return _build_system_prompt(
+            context.get('os', env['os']),
+            context.get('distro', 'Unknown'),
+            context.get('shell', env['shell']),
+            context.get('user', env['user']),
+            context.get('cwd', env['cwd']),
+            context.get('provider', 'openai')
+        )
     
     @staticmethod
     def get_error_fix_prompt(command: str, error: str, stdout: str = "", exit_code: int = 1) -> str:
@@ -97,48 +256,20 @@ Analyze this error and provide:
         """Build context-aware prompt with additional information"""
         prompt_parts = [base_query]
         
-        if 'git_info' in context:
-            prompt_parts.append(f"\nGit context: {context['git_info']}")
-        
-        if 'system_info' in context:
-            prompt_parts.append(f"\nSystem info: {context['system_info']}")
-        
-        if 'directory_info' in context:
-            prompt_parts.append(f"\nDirectory context: {context['directory_info']}")
-        
-        if 'package_manager' in context:
-            prompt_parts.append(f"\nPackage manager: {context['package_manager']}")
+        for key, label in _CONTEXT_LABELS:
+            value = context.get(key)
+            if value is not None:
+                prompt_parts.append(f"\n{label}: {value}")
         
         return "\n".join(prompt_parts)
     
     @staticmethod
     def get_ollama_optimized_prompt(prompt: str, model: str) -> str:
         """Optimize prompts for specific Ollama models"""
-        # Model-specific optimizations
-        if 'deepseek' in model.lower():
-            # DeepSeek models work well with structured thinking
-            return f"""<thinking>
-Let me analyze this request step by step.
-</thinking>
-
-{prompt}
-
-Remember to respond with valid JSON only."""
-        
-        elif 'qwen' in model.lower():
-            # Qwen models are good with direct instructions
-            return f"""{prompt}
-
-Output only valid JSON matching the specified format."""
-        
-        elif 'llama' in model.lower():
-            # Llama models benefit from examples
-            return f"""{prompt}
-
-Example response:
-{{"command": "ls -la", "explanation": "Lists all files with details", "risks": [], "alternatives": ["ls -l", "ls -a"], "safe_to_auto_execute": true}}"""
-        
-        return prompt
+        family = _model_family(model)
+        if not family:
+            return prompt
+        return _ollama_optimized_prompt(prompt, family)
     
     @staticmethod
     def format_ollama_messages(system_prompt: str, user_prompt: str, model: str) -> str:
@@ -155,28 +286,105 @@ ASSISTANT RESPONSE (JSON only):"""
         
         return full_prompt
     
+    @staticmethod
+    def get_batch_prompt(queries: List[str]) -> str:
+        """Build one prompt asking for a suggestion per numbered query"""
+        numbered = "\n".join(f"{i}) {q}" for i, q in enumerate(queries, 1))
+        return f"""Respond with a JSON array of {len(queries)} objects, one per query, in the same order.
+Each object must use the response format described above.
+
+QUERIES:
+{numbered}"""
+    
+    @staticmethod
+    def format_ollama_batch_messages(system_prompt: str, batch_prompt: str) -> str:
+        """Format a batched request for the Ollama API"""
+        return f"""{system_prompt}
+
+USER REQUESTS: {batch_prompt}
+
+ASSISTANT RESPONSE (JSON array only):"""
+    
+    @staticmethod
+    def validate_json_array_response(response: str, count: int) -> List[Dict]:
+        """Validate a batched JSON array response and split it per query
+        
+        Always returns exactly count suggestions; entries that are missing
+        or malformed are replaced with the safe fallback.
+        """
+        def fallback(reason: str) -> Dict:
+            return {
+                "command": "echo 'Error parsing AI response'",
+                "explanation": f"AI response was not valid JSON: {reason}",
+                "risks": ["Response parsing failed"],
+                "alternatives": [],
+                "safe_to_auto_execute": False
+            }
+        
+        response = response.strip()
+        
+        # Remove markdown code blocks if present
+        if response.startswith('```'):
+            response = _FENCE_OPEN.sub('', response)
+            response = _FENCE_CLOSE.sub('', response)
+        
+        # Extract the array if wrapped in text: the first bracketed span that
+        # parses as an array of objects, so brackets in surrounding prose
+        # ("Here are [3] commands: [...]") are skipped
+        items = None
+        for span in _json_array_spans(response):
+            try:
+                parsed = loads(span)
+            except JSONDecodeError:
+                continue
+            if isinstance(parsed, list) and any(isinstance(item, dict) for item in parsed):
+                items = parsed
+                break
+        
+        if items is None:
+            try:
+                items = loads(response)
+            except JSONDecodeError as e:
+                return [fallback(str(e)) for _ in range(count)]
+        
+        if not isinstance(items, list):
+            return [fallback("expected a JSON array") for _ in range(count)]
+        
+        suggestions = [
+            item if isinstance(item, dict) else fallback("expected a JSON object")
+            for item in items[:count]
+        ]
+        suggestions.extend(fallback("missing from batch response")
+                           for _ in range(count - len(suggestions)))
+        return suggestions
+    
     @staticmethod
     def validate_json_response(response: str) -> Dict:
         """Validate and clean JSON response from AI"""
-        import json
-        import re
-        
         # Clean common issues
         response = response.strip()
         
+        # Fast path: JSON-mode responses parse directly
+        try:
+            parsed = loads(response)
+            if isinstance(parsed, dict):
+                return parsed
+        except JSONDecodeError:
+            pass
+        
         # Remove markdown code blocks if present
         if response.startswith('```'):
-            response = re.sub(r'^```[a-z]*\n', '', response)
-            response = re.sub(r'\n```$', '', response)
+            response = _FENCE_OPEN.sub('', response)
+            response = _FENCE_CLOSE.sub('', response)
         
-        # Extract JSON if wrapped in text
-        json_match = re.search(r'\{[^{}]*\}', response, re.DOTALL)
-        if json_match:
-            response = json_match.group()
+        # Extract JSON if wrapped in text (nested objects/arrays included)
+        extracted = _extract_json_object(response)
+        if extracted is not None:
+            response = extracted
         
         try:
-            return json.loads(response)
-        except json.JSONDecodeError as e:
+            return loads(response)
+        except JSONDecodeError as e:
             # Return safe fallback
             return {
                 "command": "echo 'Error parsing AI response'",
@@ -4,69 +4,325 @@ Provides context about the current environment
 """
 
 import os
+import re
+import math
 import platform
+import shutil
+import functools
 import subprocess
 import socket
-from typing import Dict, Optional, List
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, List
 from pathlib import Path
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+
+# Common package managers in order of preference
+_PKG_MANAGERS = (
+    'apt',      # Debian/Ubuntu
+    'dnf',      # Fedora/RHEL 8+
+    'yum',      # RHEL/CentOS
+    'pacman',   # Arch
+    'zypper',   # openSUSE
+    'brew',     # macOS/Linux
+    'apk',      # Alpine
+    'emerge',   # Gentoo
+    'pkg',      # FreeBSD
+)
+
+# /etc marker files for distros without os-release, in order of preference
+_DISTRO_FILES = (
+    ('debian_version', 'Debian'),
+    ('redhat-release', 'Red Hat'),
+    ('fedora-release', 'Fedora'),
+    ('arch-release', 'Arch Linux'),
+    ('gentoo-release', 'Gentoo'),
+    ('SuSE-release', 'openSUSE'),
+)
+
+# Project files reported by get_directory_info, in display order
+_COMMON_FILES = ('.git', '.env', 'package.json', 'requirements.txt',
+                 'Makefile', 'Dockerfile', 'docker-compose.yml')
+
+# os-release fields, optionally quoted
+_PRETTY_NAME_RE = re.compile(rb'^PRETTY_NAME="?([^"\n]+)', re.M)
+_NAME_RE = re.compile(rb'^NAME="?([^"\n]+)', re.M)
+
+# Header forms `git status --branch` uses before the first commit
+_UNBORN_PREFIXES = ('No commits yet on ', 'Initial commit on ')
+
+def _parse_git_status(repo_path: str, status: Optional[bytes]) -> Dict[str, any]:
+    """Build git_info from the repo root and `git status --porcelain --branch` output"""
+    info = {'repo': os.path.basename(repo_path), 'repo_path': repo_path}
+    if status is None:
+        info['has_remote'] = False
+        return info
+    
+    # The first line is "## <branch>[...<upstream>] [ahead/behind]"
+    header, _, changes = status.partition(b'\n')
+    branch = header[3:].decode('utf-8', 'replace')
+    if branch.startswith('HEAD (no branch)'):
+        info['branch'] = 'detached HEAD'
+        info['has_remote'] = False
+    else:
+        for prefix in _UNBORN_PREFIXES:
+            if branch.startswith(prefix):
+                branch = branch[len(prefix):]
+                break
+        branch, tracking, _ = branch.partition('...')
+        info['branch'] = branch
+        info['has_remote'] = bool(tracking)
+    
+    # One line per changed path, each newline-terminated
+    modified = changes.count(b'\n')
+    if changes and not changes.endswith(b'\n'):
+        modified += 1
+    info['modified_files'] = modified
+    info['clean'] = modified == 0
+    return info
+
+def _find_repo_root(path: str) -> Optional[str]:
+    """Find the enclosing work tree by looking for .git, without running git"""
+    path = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(path, '.git')):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def _tree_size(path: str) -> int:
+    """Total apparent size in bytes of everything under path"""
+    size = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        size += entry.stat(follow_symlinks=False).st_size
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return size
+
+def _human_readable(size: float) -> str:
+    """Format a byte count the way du/df -h do (e.g. 512, 4.0K, 13M), rounding up"""
+    for unit in ('', 'K', 'M', 'G', 'T'):
+        if size < 1024 or unit == 'T':
+            break
+        size /= 1024
+    if unit and size < 10:
+        return f"{math.ceil(size * 10) / 10:.1f}{unit}"
+    return f"{math.ceil(size)}{unit}"
+
+def _meminfo_kb(buf: bytes, field: bytes) -> Optional[int]:
+    """Extract a 'Field:   123 kB' value from raw /proc/meminfo bytes"""
+    start = buf.find(field)
+    if start == -1:
+        return None
+    start += len(field)
+    end = buf.find(b'\n', start)
+    return int(buf[start:end if end != -1 else None].split()[0])
+
+# Seconds a probe may run before it is killed and treated as failed
+_PROBE_TIMEOUT = 10
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    """Run a probe command, capturing raw bytes under the C locale
+    
+    stdin is closed so a probe can never wait on the terminal; one that
+    still stalls raises subprocess.TimeoutExpired after _PROBE_TIMEOUT.
+    """
+    # Callers decode only what they parse; LC_ALL=C keeps the layout fixed
+    return subprocess.run(args, stdin=subprocess.DEVNULL, capture_output=True,
+                          timeout=_PROBE_TIMEOUT, env={**os.environ, 'LC_ALL': 'C'})
+
+# Variable each supported shell sets to its own version
+_SHELL_VERSION_VARS = {
+    'bash': 'BASH_VERSION',
+    'zsh': 'ZSH_VERSION',
+    'fish': 'FISH_VERSION',
+}
+
+@functools.lru_cache(maxsize=8)
+def _shell_version(shell_path: str, var: str, mtime_ns: int) -> Optional[str]:
+    """Ask a supported shell binary for its version (keyed on mtime to notice upgrades)"""
+    # Echoing the shell's own variable skips the banner --version prints;
+    # only that one, since fish expands a word with an unset variable to nothing
+    result = _run([shell_path, '-c', f'echo ${var}'])
+    if result.returncode == 0:
+        version = result.stdout.strip().decode('utf-8', 'replace')
+        if version:
+            return version
+    
+    # The variable came back empty; all supported shells also take --version
+    result = _run([shell_path, '--version'])
+    if result.returncode == 0:
+        return result.stdout.split(b'\n', 1)[0].strip().decode('utf-8', 'replace') or None
+    return None
+
+# libc handle for sysctlbyname on macOS, loaded on first use
+_LIBC = None
+
+def _sysctl_uint64(name: bytes) -> Optional[int]:
+    """Read a 64-bit sysctl value via libc (macOS), or None if unavailable"""
+    global _LIBC
+    try:
+        import ctypes
+        if _LIBC is None:
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.dylib')
+            # int sysctlbyname(const char *, void *, size_t *, void *, size_t);
+            # declared so newlen is passed size_t-wide, not as a C int
+            libc.sysctlbyname.argtypes = [ctypes.c_char_p, ctypes.c_void_p,
+                                          ctypes.POINTER(ctypes.c_size_t),
+                                          ctypes.c_void_p, ctypes.c_size_t]
+            libc.sysctlbyname.restype = ctypes.c_int
+            _LIBC = libc
+        
+        value = ctypes.c_uint64(0)
+        length = ctypes.c_size_t(ctypes.sizeof(value))
+        if _LIBC.sysctlbyname(name, ctypes.byref(value), ctypes.byref(length), None, 0) != 0:
+            return None
+        return value.value
+    except (OSError, AttributeError):
+        return None
+
+class LazyContext(MutableMapping):
+    """Context mapping whose expensive fields are computed on first access
+    
+    factories maps keys to zero-argument callables; each runs at most once.
+    A key listed in optional is left out when its factory returns None, so
+    only those keys are probed to answer `in`, len() or iteration.
+    """
+    
+    def __init__(self, values: Dict[str, Any], factories: Dict[str, Callable[[], Any]],
+                 optional: Iterable[str] = ()):
+        self._values = dict(values)
+        self._factories = dict(factories)
+        self._optional = frozenset(optional)
+    
+    def _resolve(self, key: str) -> None:
+        factory = self._factories.pop(key, None)
+        if factory is not None:
+            value = factory()
+            if value is not None or key not in self._optional:
+                self._values[key] = value
+    
+    def __getitem__(self, key: str) -> Any:
+        self._resolve(key)
+        return self._values[key]
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._factories.pop(key, None)
+        self._values[key] = value
+    
+    def __delitem__(self, key: str) -> None:
+        if self._factories.pop(key, None) is None:
+            del self._values[key]
+    
+    def _resolve_optional(self) -> None:
+        """Probe the pending keys whose presence depends on their value"""
+        for key in [k for k in self._factories if k in self._optional]:
+            self._resolve(key)
+    
+    def __contains__(self, key: object) -> bool:
+        if key in self._optional:
+            self._resolve(key)
+        return key in self._values or key in self._factories
+    
+    def __iter__(self) -> Iterator[str]:
+        self._resolve_optional()
+        return iter([*self._values, *self._factories])
+    
+    def __len__(self) -> int:
+        self._resolve_optional()
+        return len(self._values) + len(self._factories)
+    
+    def __repr__(self) -> str:
+        return f"LazyContext({self._values!r}, pending={list(self._factories)!r})"
 
 class SystemInfo:
     """Gather system and environment information"""
     
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop all memoized probe results so the next calls re-detect"""
+        for cached in (cls._get_os_info_cached, cls._get_linux_distro,
+                       cls.get_package_manager, cls._get_repo_root):
+            cached.cache_clear()
+    
     @staticmethod
     def get_os_info() -> Dict[str, str]:
         """Get operating system information"""
-        info = {
-            'system': platform.system(),
-            'release': platform.release(),
-            'version': platform.version(),
-            'machine': platform.machine(),
-            'processor': platform.processor(),
-            'hostname': socket.gethostname()
-        }
+        return dict(SystemInfo._get_os_info_cached())
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_os_info_cached() -> Dict[str, str]:
+        """Gather OS information (memoized by get_os_info)"""
+        if hasattr(os, 'uname'):
+            # One uname() syscall covers everything but the processor
+            u = os.uname()
+            info = {
+                'system': u.sysname,
+                'release': u.release,
+                'version': u.version,
+                'machine': u.machine,
+                'processor': platform.processor(),
+                'hostname': u.nodename
+            }
+        else:
+            info = {
+                'system': platform.system(),
+                'release': platform.release(),
+                'version': platform.version(),
+                'machine': platform.machine(),
+                'processor': platform.processor(),
+                'hostname': socket.gethostname()
+            }
         
         # Get Linux distribution info
-        if platform.system() == 'Linux':
+        if info['system'] == 'Linux':
             info['distro'] = SystemInfo._get_linux_distro()
-        elif platform.system() == 'Darwin':
+        elif info['system'] == 'Darwin':
             info['distro'] = 'macOS'
         else:
-            info['distro'] = platform.system()
+            info['distro'] = info['system']
         
         return info
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def _get_linux_distro() -> str:
         """Get Linux distribution name"""
         try:
             # Try modern method first
-            if os.path.exists('/etc/os-release'):
-                with open('/etc/os-release', 'r') as f:
-                    for line in f:
-                        if line.startswith('PRETTY_NAME='):
-                            return line.split('=')[1].strip().strip('"')
-                        elif line.startswith('NAME='):
-                            distro_name = line.split('=')[1].strip().strip('"')
+            try:
+                data = Path('/etc/os-release').read_bytes()
+            except OSError:
+                data = b''
+            match = _PRETTY_NAME_RE.search(data) or _NAME_RE.search(data)
+            if match:
+                return match.group(1).decode('utf-8', 'replace')
             
             # Fallback methods
             if os.path.exists('/etc/lsb-release'):
-                result = subprocess.run(['lsb_release', '-d'], 
-                                      capture_output=True, text=True)
+                result = _run(['lsb_release', '-d'])
                 if result.returncode == 0:
-                    return result.stdout.split(':')[1].strip()
-            
-            # Check specific distro files
-            distro_files = {
-                '/etc/debian_version': 'Debian',
-                '/etc/redhat-release': 'Red Hat',
-                '/etc/fedora-release': 'Fedora',
-                '/etc/arch-release': 'Arch Linux',
-                '/etc/gentoo-release': 'Gentoo',
-                '/etc/SuSE-release': 'openSUSE'
-            }
+                    return result.stdout.split(b':', 1)[1].strip().decode('utf-8', 'replace')
             
-            for file, distro in distro_files.items():
-                if os.path.exists(file):
+            # Check specific distro files against one listing of /etc
+            try:
+                etc_files = set(os.listdir('/etc'))
+            except OSError:
+                etc_files = set()
+            for file, distro in _DISTRO_FILES:
+                if file in etc_files:
                     return distro
             
             return 'Unknown Linux'
@@ -78,96 +334,70 @@ class SystemInfo:
     def get_shell_info() -> Dict[str, str]:
         """Get shell information"""
         info = {
-            'shell': os.getenv('SHELL', 'unknown').split('/')[-1],
-            'term': os.getenv('TERM', 'unknown'),
-            'user': os.getenv('USER', 'unknown'),
-            'home': os.getenv('HOME', 'unknown'),
-            'path': os.getenv('PATH', ''),
+            'shell': os.path.basename(os.environ.get('SHELL', 'unknown')),
+            'term': os.environ.get('TERM', 'unknown'),
+            'user': os.environ.get('USER', 'unknown'),
+            'home': os.environ.get('HOME', 'unknown'),
+            'path': os.environ.get('PATH', ''),
             'pwd': os.getcwd()
         }
         
-        # Get shell version if possible
+        # Get shell version if possible: inherited from the parent shell,
+        # else asked of the binary once per (path, mtime)
         shell_name = info['shell']
-        if shell_name in ['bash', 'zsh', 'fish']:
+        var = _SHELL_VERSION_VARS.get(shell_name)
+        version = os.environ.get(var) if var else None
+        # Only shells in _SHELL_VERSION_VARS are probed; others (sh, dash)
+        # have no version flag and would just fail
+        if var and not version:
             try:
-                result = subprocess.run([shell_name, '--version'], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    info['shell_version'] = result.stdout.split('\n')[0]
+                shell_path = os.environ.get('SHELL', '')
+                if not os.path.isabs(shell_path):
+                    shell_path = shutil.which(shell_name)
+                version = _shell_version(shell_path, var, os.stat(shell_path).st_mtime_ns)
             except Exception:
                 pass
+        if version:
+            info['shell_version'] = version
         
         return info
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def get_package_manager() -> Optional[str]:
         """Detect the system package manager"""
-        # Common package managers in order of preference
-        managers = [
-            ('apt', ['apt', '--version']),         # Debian/Ubuntu
-            ('dnf', ['dnf', '--version']),         # Fedora/RHEL 8+
-            ('yum', ['yum', '--version']),         # RHEL/CentOS
-            ('pacman', ['pacman', '--version']),   # Arch
-            ('zypper', ['zypper', '--version']),   # openSUSE
-            ('brew', ['brew', '--version']),       # macOS/Linux
-            ('apk', ['apk', '--version']),         # Alpine
-            ('emerge', ['emerge', '--version']),   # Gentoo
-            ('pkg', ['pkg', '--version']),         # FreeBSD
-        ]
-        
-        for name, cmd in managers:
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    return name
-            except FileNotFoundError:
-                continue
+        # Being on PATH is enough, so shutil.which checks without spawning anything
+        for name in _PKG_MANAGERS:
+            if shutil.which(name):
+                return name
         
         return None
     
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _get_repo_root(cwd: str) -> Optional[str]:
+        """Work-tree root containing cwd, or None (memoized; it doesn't change)"""
+        # Fails outside a work tree, so it doubles as the check
+        result = _run(['git', 'rev-parse', '--show-toplevel'])
+        if result.returncode != 0:
+            return None
+        return os.fsdecode(result.stdout.strip())
+    
     @staticmethod
     def get_git_info() -> Optional[Dict[str, str]]:
-        """Get git repository information if in a git directory"""
+        """Get git repository information if in a git directory
+        
+        Only the repository root is memoized; branch and changed files are
+        read fresh each call, since they change as the user works.
+        """
         try:
-            # Check if we're in a git repository
-            result = subprocess.run(['git', 'rev-parse', '--git-dir'], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
+            repo_path = SystemInfo._get_repo_root(os.getcwd())
+            if repo_path is None:
                 return None
             
-            info = {}
-            
-            # Get repository name
-            result = subprocess.run(['git', 'rev-parse', '--show-toplevel'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                info['repo'] = os.path.basename(result.stdout.strip())
-                info['repo_path'] = result.stdout.strip()
-            
-            # Get current branch
-            result = subprocess.run(['git', 'branch', '--show-current'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                info['branch'] = result.stdout.strip() or 'detached HEAD'
-            
-            # Get status summary
-            result = subprocess.run(['git', 'status', '--porcelain'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                modified = len([l for l in lines if l.strip()])
-                info['modified_files'] = modified
-                info['clean'] = modified == 0
-            
-            # Get remote info
-            result = subprocess.run(['git', 'remote', '-v'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                info['has_remote'] = True
-            else:
-                info['has_remote'] = False
-            
-            return info
+            # Branch, upstream and changed files from one status call
+            result = _run(['git', 'status', '--porcelain', '--branch'])
+            return _parse_git_status(repo_path, result.stdout if result.returncode == 0 else None)
             
         except Exception:
             return None
@@ -176,36 +406,36 @@ class SystemInfo:
     def get_directory_info(path: str = '.') -> Dict[str, any]:
         """Get information about a directory"""
         try:
-            path_obj = Path(path).resolve()
+            abs_path = os.path.realpath(path)
             
             info = {
-                'path': str(path_obj),
-                'exists': path_obj.exists(),
-                'is_writable': os.access(str(path_obj), os.W_OK),
-                'is_readable': os.access(str(path_obj), os.R_OK)
+                'path': abs_path,
+                'exists': os.path.exists(abs_path),
+                'is_writable': os.access(abs_path, os.W_OK),
+                'is_readable': os.access(abs_path, os.R_OK)
             }
             
-            if path_obj.exists() and path_obj.is_dir():
-                # Count files and directories
-                items = list(path_obj.iterdir())
-                info['total_items'] = len(items)
-                info['files'] = len([i for i in items if i.is_file()])
-                info['directories'] = len([i for i in items if i.is_dir()])
+            if os.path.isdir(abs_path):
+                # Count files and directories in one scandir pass
+                total = files = directories = 0
+                names = set()
+                with os.scandir(abs_path) as entries:
+                    for entry in entries:
+                        total += 1
+                        names.add(entry.name)
+                        if entry.is_file():
+                            files += 1
+                        elif entry.is_dir():
+                            directories += 1
+                info['total_items'] = total
+                info['files'] = files
+                info['directories'] = directories
                 
-                # Get size (simplified)
-                try:
-                    result = subprocess.run(['du', '-sh', str(path_obj)], 
-                                          capture_output=True, text=True)
-                    if result.returncode == 0:
-                        info['size'] = result.stdout.split('\t')[0]
-                except Exception:
-                    pass
+                # Get size (apparent size of the whole tree, like du -sh)
+                info['size'] = _human_readable(_tree_size(abs_path))
                 
-                # Check for common files
-                common_files = ['.git', '.env', 'package.json', 'requirements.txt', 
-                               'Makefile', 'Dockerfile', 'docker-compose.yml']
-                info['special_files'] = [f for f in common_files 
-                                       if (path_obj / f).exists()]
+                # Check for common files among the names already scanned
+                info['special_files'] = [f for f in _COMMON_FILES if f in names]
             
             return info
             
@@ -220,19 +450,26 @@ class SystemInfo:
         # Memory info
         try:
             if platform.system() == 'Linux':
-                with open('/proc/meminfo', 'r') as f:
-                    for line in f:
-                        if line.startswith('MemTotal:'):
-                            total = int(line.split()[1]) // 1024  # Convert to MB
-                            info['memory_total'] = f"{total} MB"
-                        elif line.startswith('MemAvailable:'):
-                            avail = int(line.split()[1]) // 1024
-                            info['memory_available'] = f"{avail} MB"
+                # One read of the raw bytes; both fields sit near the top
+                fd = os.open('/proc/meminfo', os.O_RDONLY)
+                try:
+                    buf = os.read(fd, 4096)
+                finally:
+                    os.close(fd)
+                
+                total = _meminfo_kb(buf, b'MemTotal:')
+                if total is not None:
+                    info['memory_total'] = f"{total // 1024} MB"  # Convert to MB
+                avail = _meminfo_kb(buf, b'MemAvailable:')
+                if avail is not None:
+                    info['memory_available'] = f"{avail // 1024} MB"
             elif platform.system() == 'Darwin':  # macOS
-                result = subprocess.run(['sysctl', 'hw.memsize'], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    bytes_val = int(result.stdout.split(':')[1].strip())
+                bytes_val = _sysctl_uint64(b'hw.memsize')
+                if bytes_val is None:
+                    result = _run(['sysctl', 'hw.memsize'])
+                    if result.returncode == 0:
+                        bytes_val = int(result.stdout.split(b':', 1)[1])
+                if bytes_val is not None:
                     info['memory_total'] = f"{bytes_val // (1024**2)} MB"
         except Exception:
             pass
@@ -242,44 +479,87 @@ class SystemInfo:
             info['cpu_count'] = os.cpu_count()
             
             if platform.system() == 'Linux':
-                result = subprocess.run(['nproc'], capture_output=True, text=True)
-                if result.returncode == 0:
-                    info['cpu_cores'] = result.stdout.strip()
+                # CPUs this process may run on (what nproc reports)
+                info['cpu_cores'] = str(len(os.sched_getaffinity(0)))
         except Exception:
             pass
         
-        # Disk info
+        # Disk info (same figures as df -h .)
         try:
-            result = subprocess.run(['df', '-h', '.'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                if len(lines) > 1:
-                    parts = lines[1].split()
-                    if len(parts) >= 4:
-                        info['disk_used'] = parts[2]
-                        info['disk_available'] = parts[3]
-                        info['disk_usage'] = parts[4]
+            st = os.statvfs('.')
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            avail = st.f_bavail * st.f_frsize
+            info['disk_used'] = _human_readable(used)
+            info['disk_available'] = _human_readable(avail)
+            if used + avail:
+                info['disk_usage'] = f"{-(-used * 100 // (used + avail))}%"
         except Exception:
             pass
         
         return info
     
     @staticmethod
-    def get_full_context() -> Dict[str, any]:
-        """Get complete system context"""
-        context = {
+    def get_full_context(parallel: bool = False) -> 'LazyContext':
+        """Get complete system context
+        
+        os/shell/user/cwd are filled in immediately; distro, package_manager
+        and git_info are probed on first access, so callers that never read
+        them never pay for them. distro and package_manager are memoized for
+        the process; git_info is read fresh for each context. Callers may add
+        their own keys. With parallel=True the git probe starts on a worker
+        thread right away; only worth it when git status is slow (large
+        repositories), since the thread costs more than tiny probes save.
+        """
+        git_info = SystemInfo.get_git_info
+        if parallel:
+            pool = ThreadPoolExecutor(max_workers=1)
+            git_info = pool.submit(SystemInfo.get_git_info).result
+            pool.shutdown(wait=False)
+        
+        return LazyContext(
+            {
+                'os': platform.system(),
+                'shell': os.path.basename(os.environ.get('SHELL', 'bash')),
+                'user': os.environ.get('USER', 'user'),
+                'cwd': os.getcwd()
+            },
+            {
+                'distro': SystemInfo._get_linux_distro if platform.system() == 'Linux' else platform.system,
+                'package_manager': SystemInfo.get_package_manager,
+                'git_info': git_info
+            },
+            optional=('git_info',)
+        )
+    
+    @staticmethod
+    def get_full_context_fast() -> Dict[str, any]:
+        """Get complete system context spawning at most one process
+        
+        Same keys as get_full_context, but the repository root is found by
+        looking for .git rather than asking git, so `git status` is the only
+        subprocess. Not memoized; use it for a fresh snapshot.
+        """
+        context = SystemInfo._get_base_context()
+        
+        repo_path = _find_repo_root(context['cwd'])
+        if repo_path:
+            try:
+                result = _run(['git', 'status', '--porcelain', '--branch'])
+                if result.returncode == 0:
+                    context['git_info'] = _parse_git_status(repo_path, result.stdout)
+            except Exception:
+                pass
+        
+        return context
+    
+    @staticmethod
+    def _get_base_context() -> Dict[str, any]:
+        """Context fields that need no subprocess"""
+        return {
             'os': platform.system(),
             'distro': SystemInfo._get_linux_distro() if platform.system() == 'Linux' else platform.system(),
-            'shell': os.getenv('SHELL', 'bash').split('/')[-1],
-            'user': os.getenv('USER', 'user'),
+            'shell': os.path.basename(os.environ.get('SHELL', 'bash')),
+            'user': os.environ.get('USER', 'user'),
             'cwd': os.getcwd(),
             'package_manager': SystemInfo.get_package_manager()
-        }
-        
-        # Add optional context
-        git_info = SystemInfo.get_git_info()
-        if git_info:
-            context['git_info'] = git_info
-        
-        return context
\ No newline at end of file
+        }
\ No newline at end of file
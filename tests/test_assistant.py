@@ -0,0 +1,77 @@
+"""
+Tests for the Shell AI assistant core
+"""
+
+from shell_ai.assistant import ShellAIAssistant, _batch_max_tokens, _BATCH_MAX_TOKENS
+
+def test_batch_max_tokens_scales_small_batches():
+    assert _batch_max_tokens(1000, 1) == 1000
+    assert _batch_max_tokens(500, 3) == 1500
+
+def test_batch_max_tokens_caps_full_batch():
+    # A full batch on the default config (1000 per item) must stay under the cap
+    assert _batch_max_tokens(1000, ShellAIAssistant.BATCH_SIZE) == _BATCH_MAX_TOKENS
+    assert _BATCH_MAX_TOKENS == 4096
+
+def test_json_mode_only_for_supporting_models():
+    from shell_ai.assistant import _supports_json_mode
+    
+    assert not _supports_json_mode('gpt-4')
+    assert not _supports_json_mode('gpt-3.5-turbo-0613')
+    assert _supports_json_mode('gpt-4o-mini')
+    assert _supports_json_mode('gpt-4-turbo')
+    assert _supports_json_mode('gpt-3.5-turbo')
+
+def _assistant(monkeypatch, tmp_path):
+    """An OpenAI-configured assistant whose model calls are counted"""
+    import asyncio
+    from shell_ai.config import Config
+    
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    assistant = ShellAIAssistant(Config(str(tmp_path / 'config.json')))
+    calls = []
+    
+    async def fake_suggestion(user_input, stateless=False):
+        calls.append((user_input, stateless))
+        await asyncio.sleep(0)
+        return {"command": f"echo {user_input}", "explanation": "", "risks": [],
+                "alternatives": [], "safe_to_auto_execute": True}
+    
+    monkeypatch.setattr(assistant, '_get_openai_suggestion', fake_suggestion)
+    return assistant, calls
+
+def test_repeated_stateless_query_calls_model_once(monkeypatch, tmp_path):
+    import asyncio
+    
+    assistant, calls = _assistant(monkeypatch, tmp_path)
+    first = asyncio.run(assistant.get_command_suggestion_async('list files', stateless=True))
+    second = asyncio.run(assistant.get_command_suggestion_async('list files', stateless=True))
+    assert first == second
+    assert len(calls) == 1
+
+def test_stateful_queries_bypass_cache(monkeypatch, tmp_path):
+    assistant, calls = _assistant(monkeypatch, tmp_path)
+    assistant.get_command_suggestion('list files')
+    assistant.get_command_suggestion('list files')
+    assert len(calls) == 2
+
+def test_read_key_without_tty_takes_first_character(monkeypatch, capsys):
+    import io
+    from shell_ai.assistant import _read_key
+    
+    monkeypatch.setattr('sys.stdin', io.StringIO("yes\n  e\n\n"))
+    assert _read_key("? ") == 'y'
+    assert _read_key("? ") == 'e'
+    assert _read_key("? ") == ''
+    assert capsys.readouterr().out == "? ? ? "
+
+def test_user_choice_maps_keys_and_retries_empty_input(monkeypatch, capsys):
+    import io
+    
+    monkeypatch.setattr('sys.stdin', io.StringIO("Y\nn\n\ne\n"))
+    choose = lambda: ShellAIAssistant.get_user_choice(None, {'safe_to_auto_execute': True})
+    assert choose() == 'execute'
+    assert choose() == 'cancel'
+    # An empty line is rejected and the prompt repeats
+    assert choose() == 'edit'
+    assert capsys.readouterr().out.count('Invalid choice') == 1
@@ -0,0 +1,162 @@
+"""
+Tests for the command executor
+"""
+
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+from shell_ai import command_executor
+from shell_ai.command_executor import CommandExecutor
+
+def _python(code):
+    """argv running a Python snippet in a child interpreter"""
+    return [sys.executable, '-c', code]
+
+def test_tail_is_capped_in_bytes_for_one_huge_line():
+    executor = CommandExecutor()
+    executor.MAX_OUTPUT_BYTES = 1024
+    
+    returncode, stdout, _ = executor._run_process(
+        _python("import sys; sys.stdout.write('a' * 100000 + 'END')"), shell=False
+    )
+    assert returncode == 0
+    note, tail = stdout.split('\n', 1)
+    assert 'truncated' in note
+    assert len(tail) == 1024
+    assert tail.endswith('END')
+
+def test_tail_keeps_last_lines():
+    executor = CommandExecutor()
+    executor.MAX_OUTPUT_LINES = 2
+    
+    _, stdout, _ = executor._run_process(_python("print('\\n'.join(map(str, range(5))))"), shell=False)
+    assert stdout == "[... 3 earlier lines truncated ...]\n3\n4\n"
+
+def test_timeout_reports_failure():
+    executor = CommandExecutor()
+    executor.TIMEOUT = 0.5
+    
+    result = executor.execute("sleep 30")
+    assert not result['success']
+    assert result['returncode'] == -1
+    assert 'timed out' in result['stderr']
+
+def test_timeout_releases_pipes(monkeypatch):
+    processes = []
+    
+    class RecordingPopen(subprocess.Popen):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            processes.append(self)
+    
+    monkeypatch.setattr(command_executor.subprocess, 'Popen', RecordingPopen)
+    executor = CommandExecutor()
+    executor.TIMEOUT = 0.5
+    
+    with pytest.raises(subprocess.TimeoutExpired):
+        executor._run_process(_python("import time; time.sleep(30)"), shell=False)
+    process, = processes
+    assert process.returncode is not None
+    assert process.stdout.closed and process.stderr.closed
+    assert process.stdin is None
+
+def _record_runs(monkeypatch, executor):
+    """Record (args, shell) for every process the executor starts"""
+    runs = []
+    run_process = executor._run_process
+    
+    def recording(args, shell):
+        runs.append((args, shell))
+        return run_process(args, shell)
+    
+    monkeypatch.setattr(executor, '_run_process', recording)
+    return runs
+
+def test_simple_argv_splits_quoted_arguments():
+    assert CommandExecutor._simple_argv("grep -r 'hello world' \"src dir\"") == [
+        'grep', '-r', 'hello world', 'src dir'
+    ]
+    assert CommandExecutor._simple_argv("echo 'unterminated") is None
+    assert CommandExecutor._simple_argv("   ") is None
+
+def test_metacharacters_go_to_the_shell(monkeypatch):
+    executor = CommandExecutor()
+    runs = _record_runs(monkeypatch, executor)
+    
+    result = executor.execute("echo one; echo two")
+    assert result['stdout'] == "one\ntwo\n"
+    assert runs == [("echo one; echo two", True)]
+
+def test_plain_command_is_executed_directly(monkeypatch):
+    executor = CommandExecutor()
+    runs = _record_runs(monkeypatch, executor)
+    
+    result = executor.execute("echo 'a  b'")
+    assert result['stdout'] == "a  b\n"
+    assert runs == [(['echo', 'a  b'], False)]
+
+@pytest.mark.skipif(shutil.which('cd') is not None, reason="system ships a cd binary")
+def test_builtin_falls_back_to_the_shell(monkeypatch):
+    # No cd binary exists, so the direct exec fails and sh runs the builtin
+    executor = CommandExecutor()
+    runs = _record_runs(monkeypatch, executor)
+    
+    result = executor.execute("cd /")
+    assert result['success']
+    assert runs == [(['cd', '/'], False), ("cd /", True)]
+
+def test_missing_binary_reports_shell_error(monkeypatch):
+    executor = CommandExecutor()
+    runs = _record_runs(monkeypatch, executor)
+    
+    result = executor.execute("shell-ai-no-such-binary --flag")
+    assert not result['success']
+    assert result['returncode'] == 127
+    assert 'not found' in result['stderr']
+    assert [shell for _, shell in runs] == [False, True]
+
+def _required_literals(pattern):
+    """Literal runs every match of a simple regex must contain"""
+    runs, run = [], ''
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped in 'sSdDwWbB':
+                runs.append(run)
+                run = ''
+            else:
+                run += escaped
+            continue
+        i += 1
+        if c in '*?':
+            # The preceding character is optional
+            runs.append(run[:-1])
+            run = ''
+        elif c in '.+()[]{}^$':
+            runs.append(run)
+            run = ''
+        else:
+            assert c != '|', f"top-level alternation in {pattern!r}"
+            run += c
+    runs.append(run)
+    return [r.lower() for r in runs if r]
+
+def test_every_dangerous_pattern_contains_a_needle():
+    for pattern in CommandExecutor.DANGEROUS_PATTERNS:
+        literals = _required_literals(pattern)
+        assert any(needle in literal
+                   for literal in literals for needle in command_executor._DANGER_NEEDLES), pattern
+
+def test_preflight_is_case_insensitive():
+    executor = CommandExecutor()
+    dangerous, risks = executor.is_dangerous("RM -rf /")
+    assert dangerous
+    assert any('rm' in risk for risk in risks)
+    assert executor.is_dangerous("MKFS.ext4 /dev/sda1")[0]
+    assert executor.is_dangerous("ls -la") == (False, [])
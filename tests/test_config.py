@@ -0,0 +1,108 @@
+"""
+Tests for configuration loading and caching
+"""
+
+import os
+import json
+
+import pytest
+
+from shell_ai import config as config_module
+from shell_ai.config import Config
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    """Keep the developer's environment out of the loaded config"""
+    for var, _ in config_module._ENV_MAP:
+        monkeypatch.delenv(var, raising=False)
+
+def _write(path, data, mtime_ns):
+    """Write a config file with an explicit mtime"""
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_editing_the_file_invalidates_the_cache(tmp_path):
+    path = tmp_path / 'config.json'
+    _write(path, {"openai": {"model": "gpt-4o"}}, 1_000_000_000)
+    assert Config(str(path)).model == "gpt-4o"
+    assert config_module._CONFIG_CACHE[str(path)][0] == 1_000_000_000
+    
+    _write(path, {"openai": {"model": "gpt-4-turbo"}}, 2_000_000_000)
+    assert Config(str(path)).model == "gpt-4-turbo"
+
+def test_unchanged_file_is_parsed_once(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    _write(path, {"provider": "ollama"}, 1_000_000_000)
+    assert Config(str(path)).provider == "ollama"
+    
+    parses = []
+    real_loads = config_module.loads
+    monkeypatch.setattr(config_module, 'loads', lambda data: parses.append(data) or real_loads(data))
+    assert Config(str(path)).provider == "ollama"
+    assert parses == []
+
+def test_instances_do_not_share_state(tmp_path):
+    path = tmp_path / 'config.json'
+    _write(path, {"openai": {"model": "gpt-4o"}}, 1_000_000_000)
+    first = Config(str(path))
+    first.set('openai.model', 'changed')
+    assert Config(str(path)).model == "gpt-4o"
+
+def test_paths_do_not_share_an_entry(tmp_path):
+    a = tmp_path / 'a.json'
+    b = tmp_path / 'b.json'
+    # Same mtime on both, so only the path can tell the entries apart
+    _write(a, {"openai": {"model": "gpt-4o"}}, 1_000_000_000)
+    _write(b, {"openai": {"model": "gpt-4-turbo"}}, 1_000_000_000)
+    assert Config(str(a)).model == "gpt-4o"
+    assert Config(str(b)).model == "gpt-4-turbo"
+
+def test_set_clears_provider_and_model_caches(tmp_path):
+    config = Config(str(tmp_path / 'missing.json'))
+    assert config.provider == "openai"
+    assert config.model == Config.DEFAULTS["openai"]["model"]
+    
+    config.set('openai.model', 'gpt-4o')
+    assert config.model == "gpt-4o"
+    
+    config.set('provider', 'ollama')
+    assert config.provider == "ollama"
+    assert config.is_ollama
+    assert config.model == Config.DEFAULTS["ollama"]["model"]
+
+def test_save_keeps_a_symlinked_config(tmp_path):
+    real = tmp_path / 'dotfiles' / 'config.json'
+    real.parent.mkdir()
+    real.write_text('{}')
+    link = tmp_path / 'config.json'
+    link.symlink_to(real)
+    
+    config = Config(str(link))
+    config.set('openai.model', 'gpt-4o')
+    config.save()
+    
+    assert link.is_symlink()
+    assert json.loads(real.read_text())['openai']['model'] == 'gpt-4o'
+    assert sorted(p.name for p in real.parent.iterdir()) == ['config.json']
+
+def test_save_masks_api_key(tmp_path, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-secret')
+    path = tmp_path / 'config.json'
+    config = Config(str(path))
+    config.save()
+    
+    assert json.loads(path.read_text())['openai']['api_key'] == '***'
+    assert config.api_key == 'sk-secret'
+
+def test_failed_save_removes_temp_file(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    path.write_text('{"provider": "openai"}')
+    
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(config_module.os, 'replace', failing_replace)
+    Config(str(path)).save()
+    
+    assert [p.name for p in tmp_path.iterdir()] == ['config.json']
+    assert path.read_text() == '{"provider": "openai"}'
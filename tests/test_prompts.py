@@ -0,0 +1,41 @@
+"""
+Tests for prompt building and response parsing
+"""
+
+from shell_ai.prompts import PromptBuilder
+
+def _item(command):
+    return '{"command": "%s", "explanation": "x [y]", "risks": [], "alternatives": ["a"]}' % command
+
+def test_array_response_skips_bracketed_preamble():
+    response = f"Here are [3] commands: [{_item('ls')}, {_item('pwd')}] Note: see [man ls]."
+    suggestions = PromptBuilder.validate_json_array_response(response, 2)
+    assert [s['command'] for s in suggestions] == ['ls', 'pwd']
+
+def test_array_response_plain_and_fenced():
+    body = f"[{_item('ls')}]"
+    for response in (body, f"```json\n{body}\n```"):
+        suggestions = PromptBuilder.validate_json_array_response(response, 2)
+        assert suggestions[0]['command'] == 'ls'
+        assert suggestions[1]['explanation'].endswith('missing from batch response')
+
+def test_array_response_without_array_falls_back():
+    suggestions = PromptBuilder.validate_json_array_response("Sorry, [no] idea", 2)
+    assert len(suggestions) == 2
+    assert all(s['command'] == "echo 'Error parsing AI response'" for s in suggestions)
+
+def test_object_response_skips_preamble():
+    response = 'Sure! {"command": "ls", "explanation": "}", "risks": []} Done {x}'
+    assert PromptBuilder.validate_json_response(response)['command'] == 'ls'
+
+def test_scanner_ignores_quotes_in_preamble():
+    from shell_ai.prompts import JSONObjectScanner
+    
+    # An odd quote before the object must not flip string tracking
+    text = 'Here\'s the "answer: {"command": "echo }"} trailing'
+    scanner = JSONObjectScanner()
+    results = [scanner.feed(ch) for ch in text]
+    assert results[text.index('{')] is None
+    assert results[-1] == '{"command": "echo }"}'
+    assert results.index(results[-1]) == text.index('} trailing')
+    assert scanner.text == text
@@ -0,0 +1,113 @@
+"""
+Tests for system context gathering
+"""
+
+from shell_ai.system_info import _parse_git_status
+
+def test_git_status_branch_with_upstream():
+    info = _parse_git_status('/src/repo', b'## main...origin/main\n')
+    assert info == {'repo': 'repo', 'repo_path': '/src/repo', 'branch': 'main',
+                    'has_remote': True, 'modified_files': 0, 'clean': True}
+
+def test_git_status_ahead_behind():
+    status = b'## feature/x...origin/feature/x [ahead 2, behind 1]\n M a.py\nM  b.py\n'
+    info = _parse_git_status('/src/repo', status)
+    assert info['branch'] == 'feature/x'
+    assert info['has_remote']
+    assert info['modified_files'] == 2
+    assert not info['clean']
+
+def test_git_status_no_commits_yet():
+    info = _parse_git_status('/src/new', b'## No commits yet on main\nA  README.md\n')
+    assert info['branch'] == 'main'
+    assert not info['has_remote']
+    assert info['modified_files'] == 1
+
+def test_git_status_detached_head():
+    info = _parse_git_status('/src/repo', b'## HEAD (no branch)\n')
+    assert info['branch'] == 'detached HEAD'
+    assert not info['has_remote']
+    assert info['clean']
+
+def test_git_status_untracked_only():
+    # Counted even without a trailing newline
+    info = _parse_git_status('/src/repo', b'## main\n?? new.txt\n?? notes.md')
+    assert info['branch'] == 'main'
+    assert not info['has_remote']
+    assert info['modified_files'] == 2
+    assert not info['clean']
+
+def test_git_status_unavailable():
+    assert _parse_git_status('/src/repo', None) == {
+        'repo': 'repo', 'repo_path': '/src/repo', 'has_remote': False
+    }
+
+def test_git_info_is_fresh_and_unshared(tmp_path, monkeypatch):
+    import subprocess
+    from shell_ai.system_info import SystemInfo
+    
+    subprocess.run(['git', 'init', '-q', str(tmp_path)], check=True)
+    monkeypatch.chdir(tmp_path)
+    SystemInfo.invalidate()
+    
+    first = SystemInfo.get_git_info()
+    assert first['clean']
+    first['clean'] = 'mutated'
+    
+    (tmp_path / 'new.txt').write_text('x')
+    second = SystemInfo.get_git_info()
+    assert second['modified_files'] == 1
+    assert second['clean'] is False
+    assert second['repo_path'] == first['repo_path']
+
+def _lazy():
+    """A LazyContext whose factory calls are recorded"""
+    from shell_ai.system_info import LazyContext
+    
+    calls = []
+    
+    def probe(key, value):
+        def factory():
+            calls.append(key)
+            return value
+        return factory
+    
+    context = LazyContext(
+        {'os': 'Linux'},
+        {'distro': probe('distro', 'Debian'), 'package_manager': probe('package_manager', 'apt'),
+         'git_info': probe('git_info', None)},
+        optional=('git_info',)
+    )
+    return context, calls
+
+def test_lazy_context_probes_once_on_first_access():
+    context, calls = _lazy()
+    assert calls == []
+    assert context['distro'] == 'Debian'
+    assert context['distro'] == 'Debian'
+    assert calls == ['distro']
+
+def test_lazy_context_membership_skips_required_probes():
+    context, calls = _lazy()
+    assert 'distro' in context
+    assert 'missing' not in context
+    assert calls == []
+    
+    # Optional keys must be probed to know whether they exist
+    assert 'git_info' not in context
+    assert calls == ['git_info']
+
+def test_lazy_context_len_and_iter_only_probe_optional_keys():
+    context, calls = _lazy()
+    assert len(context) == 3
+    assert sorted(context) == ['distro', 'os', 'package_manager']
+    assert calls == ['git_info']
+
+def test_lazy_context_assignment_overrides_lazy_key():
+    context, calls = _lazy()
+    context['distro'] = 'Arch Linux'
+    assert context['distro'] == 'Arch Linux'
+    del context['package_manager']
+    assert 'package_manager' not in context
+    assert calls == []
+    assert dict(context) == {'os': 'Linux', 'distro': 'Arch Linux'}